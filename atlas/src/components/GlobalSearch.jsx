@@ -1,25 +1,43 @@
 import { useFrappeGetCall } from "frappe-react-sdk";
 import { Search, X } from "lucide-react";
-import React, { useEffect, useRef, useState } from "react";
+import React, { useEffect, useMemo, useRef, useState } from "react";
 import { useNavigate } from "react-router-dom";
 
 const GlobalSearch = () => {
   const [open, setOpen] = useState(false);
   const [query, setQuery] = useState("");
   const [debouncedQuery, setDebouncedQuery] = useState("");
+  const [typeaheadQuery, setTypeaheadQuery] = useState("");
   const wrapperRef = useRef(null);
   const inputRef = useRef(null);
   const navigate = useNavigate();
 
+  useEffect(() => {
+    if (!open || !query.trim()) {
+      setTypeaheadQuery("");
+      return;
+    }
+    const timer = setTimeout(() => setTypeaheadQuery(query), 80);
+    return () => clearTimeout(timer);
+  }, [query, open]);
+
+  // Full-text search (titles and descriptions) once typing pauses.
   useEffect(() => {
     if (!open || query.length < 2) {
       setDebouncedQuery("");
       return;
     }
-    const timer = setTimeout(() => setDebouncedQuery(query), 250);
+    const timer = setTimeout(() => setDebouncedQuery(query), 400);
     return () => clearTimeout(timer);
   }, [query, open]);
 
+  const typeahead_query = useFrappeGetCall(
+    "infintrix_atlas.api.v1.search_typeahead",
+    typeaheadQuery ? { query: typeaheadQuery } : undefined,
+    typeaheadQuery ? ["search_typeahead", typeaheadQuery] : null,
+    { keepPreviousData: true },
+  );
+
   const search_query = useFrappeGetCall(
     "infintrix_atlas.api.v1.global_search",
     debouncedQuery ? { query: debouncedQuery } : undefined,
@@ -56,9 +74,21 @@ const GlobalSearch = () => {
   const handleNavigate = (route) => {
     setOpen(false);
     setQuery("");
+    // Records without an SPA page open in Desk.
+    if (route.startsWith("/app/")) {
+      window.location.href = route;
+      return;
+    }
     navigate(route);
   }
-   const results = search_query.data?.message || [];
+  const results = useMemo(() => {
+    const merged = [...(typeahead_query.data?.message || [])];
+    const seen = new Set(merged.map((item) => `${item.type}:${item.name}`));
+    for (const item of search_query.data?.message || []) {
+      if (!seen.has(`${item.type}:${item.name}`)) merged.push(item);
+    }
+    return merged;
+  }, [typeahead_query.data, search_query.data]);
 
   return (
     <div ref={wrapperRef} className="relative w-full max-w-md">
@@ -94,6 +124,8 @@ const GlobalSearch = () => {
               { type: "Task", icon: "▓" },
               { type: "Project", icon: "◆" },
               { type: "Cycle", icon: "●" },
+              { type: "Requirement", icon: "■" },
+              { type: "Change Request", icon: "▲" },
             ].map(({ type, icon }) => {
               const filtered = results.filter((item) => item.type === type);
               return filtered.length > 0 ? (
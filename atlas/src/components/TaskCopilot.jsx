@@ -330,14 +330,19 @@ const TaskCopilot = React.memo(() => {
   );
   const [isLoading, setIsLoading] = useState(false);
   const [isTyping, setIsTyping] = useState(false);
+  const [streamingText, setStreamingText] = useState("");
   const scrollRef = useRef(null);
 
   useFrappeEventListener(session_id || null, (data) => {
-    console.log("Received event for session:", session_id, data);
+    if (data.event === "chunk") {
+      setStreamingText((current) => current + data.delta);
+      return;
+    }
 
     isTyping && setIsTyping(false);
+    setStreamingText("");
 
-    if (data.record.role === "assistant") {
+    if (data.event === "response" && data.record?.role === "assistant") {
       session_messages_query.mutate(
         async (current) => {
           return [
@@ -418,11 +423,17 @@ const TaskCopilot = React.memo(() => {
           ))}
           {isTyping && (
             <div className="flex justify-start">
-              <div className="bg-slate-50 dark:bg-slate-800 p-4 rounded-2xl flex items-center gap-2">
-                <div className="w-1.5 h-1.5 bg-indigo-400 rounded-full animate-bounce" />
-                <div className="w-1.5 h-1.5 bg-indigo-400 rounded-full animate-bounce [animation-delay:0.2s]" />
-                <div className="w-1.5 h-1.5 bg-indigo-400 rounded-full animate-bounce [animation-delay:0.4s]" />
-              </div>
+              {streamingText ? (
+                <div className="bg-slate-50 dark:bg-slate-800 p-4 rounded-2xl max-w-[85%] text-xs font-mono text-slate-500 dark:text-slate-400 whitespace-pre-wrap break-words">
+                  {streamingText}
+                </div>
+              ) : (
+                <div className="bg-slate-50 dark:bg-slate-800 p-4 rounded-2xl flex items-center gap-2">
+                  <div className="w-1.5 h-1.5 bg-indigo-400 rounded-full animate-bounce" />
+                  <div className="w-1.5 h-1.5 bg-indigo-400 rounded-full animate-bounce [animation-delay:0.2s]" />
+                  <div className="w-1.5 h-1.5 bg-indigo-400 rounded-full animate-bounce [animation-delay:0.4s]" />
+                </div>
+              )}
             </div>
           )}
         </div>
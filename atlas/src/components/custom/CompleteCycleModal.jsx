@@ -80,8 +80,13 @@ export default function CompleteCycleModal() {
         name: complete_cycle,
         move_tasks_to,
       })
-      .then(() => {
-        message.success("Cycle completed");
+      .then((res) => {
+        const moved = res?.message?.moved || 0;
+        message.success(
+          moved
+            ? `Cycle completed, ${moved} open work items moved`
+            : "Cycle completed"
+        );
         onClose();
         navigate(`/tasks/backlog?project=${project_id}`);
       })
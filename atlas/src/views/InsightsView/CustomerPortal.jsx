@@ -951,6 +951,11 @@ const CustomerPortal = () => {
     "infintrix_atlas.api.v1.get_customer_portal_data",
     { project: projectId },
     projectId ? ["customer_portal_data", projectId] : null,
+    {
+      // The server rebuilds the snapshot in the background; poll until it lands.
+      refreshInterval: (latest) =>
+        latest?.message?.snapshot?.stale ? 5000 : 0,
+    },
   );
   const requirementsQuery = useFrappeGetCall(
     "infintrix_atlas.api.v1.list_project_requirements",
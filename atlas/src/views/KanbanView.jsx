@@ -345,6 +345,9 @@ export default function KanbanView() {
   const createMutation = useFrappeCreateDoc();
 
   const updateTaskMutation = useFrappeUpdateDoc();
+  const moveRankMutation = useFrappePostCall(
+    "infintrix_atlas.api.v1.move_task_rank",
+  );
 
   const project_query = useFrappeGetDoc("Project", project);
    const tasks_list_query = useTasksQuery(project);
@@ -584,11 +587,35 @@ export default function KanbanView() {
       newStatus = overTask.status;
     }
 
+    // Neighbours in the destination column; only the moved task is re-ranked.
+    const column = getSortedTasks(newStatus).filter((t) => t.id !== activeId);
+    let index = column.length;
+    if (overTask) {
+      index = column.findIndex((t) => t.id === overId);
+      if (newStatus === oldStatus) {
+        // Dragging down inside a column lands below the hovered card.
+        const original = getSortedTasks(oldStatus);
+        const fromIndex = original.findIndex((t) => t.id === activeId);
+        const toIndex = original.findIndex((t) => t.id === overId);
+        if (fromIndex < toIndex) index += 1;
+      }
+    }
+    const before = column[index - 1]?.name;
+    const after = column[index]?.name;
+
     try {
       await tasks_list_query.mutate(
         async (current) => {
+          const ranked = await moveRankMutation.call({
+            task: activeTask.name,
+            before,
+            after,
+          });
+          const rank = ranked?.message?.rank;
           const next = (current?.message || []).map((t) =>
-            t.id === activeId ? { ...t, status: newStatus } : t,
+            t.id === activeId
+              ? { ...t, status: newStatus, custom_rank: rank ?? t.custom_rank }
+              : t,
           );
 
           if (newStatus !== oldStatus) {
@@ -654,11 +681,14 @@ export default function KanbanView() {
         .map((id) => tasksById[id])
         .slice()
         .sort((a, b) => {
-          const aSort = a.custom_sort_order ?? Number.POSITIVE_INFINITY;
-
-          const bSort = b.custom_sort_order ?? Number.POSITIVE_INFINITY;
-
-          if (aSort !== bSort) return aSort - bSort;
+          // custom_rank keys compare as plain strings; unranked tasks go last.
+          const aRank = a.custom_rank || "";
+          const bRank = b.custom_rank || "";
+          if (aRank !== bRank) {
+            if (!aRank) return 1;
+            if (!bRank) return -1;
+            return aRank < bRank ? -1 : 1;
+          }
 
           return String(b.modified || "").localeCompare(
             String(a.modified || ""),
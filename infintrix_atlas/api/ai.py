@@ -1,5 +1,14 @@
 import frappe
 import json
+from frappe import _
+from frappe.utils import now
+from infintrix_atlas.board_cache import invalidate_project_board
+from infintrix_atlas.bulk import bulk_insert_docs
+from infintrix_atlas.permissions import can_view_project_board
+from infintrix_atlas.portal_snapshot import invalidate_portal_snapshot
+from infintrix_atlas.progress_counters import refresh_progress_counters
+from infintrix_atlas.ranking import next_rank, rank_between
+from infintrix_atlas.search_index import index_documents
 
 @frappe.whitelist()
 def decompose_intent(project, prompt):
@@ -82,34 +91,197 @@ def create_from_ai(project, tasks):
     if isinstance(tasks, str):
         tasks = json.loads(tasks)
 
-    frappe.get_doc("Project", project)
+    project_doc = frappe.get_doc("Project", project)
 
-    results = []
+    return _bulk_create_tasks(project_doc, tasks)
+
+
+@frappe.whitelist()
+def accept_ai_drafts(session, drafts=None):
+    """
+    Turn the open drafts of an AI Task Session (or just the `drafts` named)
+    into Tasks in one bulk write, then mark each draft Created or Failed.
+    """
+    if isinstance(drafts, str):
+        drafts = json.loads(drafts)
+
+    session_doc = frappe.get_doc("AI Task Session", session)
+    project_doc = frappe.get_doc("Project", session_doc.project)
+
+    filters = {"session": session_doc.name, "status": "Draft"}
+    if drafts:
+        filters["name"] = ["in", drafts]
+
+    rows = frappe.get_all(
+        "AI Task Draft",
+        filters=filters,
+        fields=["name", "subject", "priority", "weight", "raw_ai_payload"],
+        order_by="creation asc",
+    )
+    if not rows:
+        return []
+
+    tasks = []
+    for row in rows:
+        payload = frappe.parse_json(row.raw_ai_payload) if row.raw_ai_payload else {}
+        tasks.append({
+            "draft": row.name,
+            "subject": row.subject,
+            "priority": row.priority,
+            "weight": row.weight,
+            "description": (payload or {}).get("description", ""),
+        })
+
+    results = _bulk_create_tasks(project_doc, tasks)
+
+    _mark_drafts(results)
+
+    created = sum(1 for r in results if r["status"] == "SUCCESS")
+    session_doc.status = (
+        "Completed" if created == len(results)
+        else "Partial Success" if created
+        else "Failed"
+    )
+    session_doc.completed_on = now()
+    session_doc.save(ignore_permissions=True)
+
+    return results
+
+
+def _bulk_create_tasks(project_doc, tasks):
+    """
+    Validate `tasks` in memory and insert the valid ones with multi-row INSERTs.
+
+    Only the side effects a freshly created root Task actually needs are
+    applied, each once for the whole batch: default phase, nested set bounds,
+    the project's progress roll-up, the board cache and the search index.
+    """
+    if not can_view_project_board(project_doc.name):
+        frappe.throw(_("Not permitted to access this project"), frappe.PermissionError)
+    frappe.has_permission("Task", "create", throw=True)
 
+    phase = _default_phase(project_doc.name)
+
+    results = []
+    docs = []
     for t in tasks:
-        try:
-            doc = frappe.get_doc({
-                "doctype": "Task",
-                "subject": t["subject"],
-                "project": project,
-                "priority": t["priority"],
-                "status": "Open",
-                "custom_weight": t["weight"],
-                "custom_created_by": "AI",
-                "description": t.get("description", "")
-            })
-            doc.insert(ignore_permissions=True)
-
-            results.append({
-                "subject": t["subject"],
-                "status": "SUCCESS",
-                "task": doc.name
-            })
-        except Exception as e:
-            results.append({
-                "subject": t["subject"],
-                "status": "FAILED",
-                "error": str(e)
-            })
+        result = {"subject": t.get("subject")}
+        if t.get("draft"):
+            result["draft"] = t["draft"]
+        results.append(result)
+
+        errors = _task_errors(t)
+        if errors:
+            result.update({"status": "FAILED", "error": ", ".join(errors)})
+            continue
+
+        doc = frappe.new_doc("Task")
+        doc.update({
+            "subject": t["subject"],
+            "project": project_doc.name,
+            "priority": t.get("priority") or "Medium",
+            "status": "Open",
+            "custom_phase": phase,
+            "custom_weight": t.get("weight"),
+            "custom_created_by": "AI",
+            "description": t.get("description", ""),
+        })
+        docs.append((result, doc))
+
+    if not docs:
+        return results
+
+    # Root tasks are appended after the current right-most node, which is what
+    # NestedSet.on_update would do one row at a time.
+    last_rgt = frappe.db.sql("select coalesce(max(rgt), 0) from `tabTask` for update")[0][0]
+    rank = None
+    for offset, (_result, doc) in enumerate(docs):
+        doc.lft = last_rgt + 2 * offset + 1
+        doc.rgt = doc.lft + 1
+        # New tasks go to the bottom of the board, like ranking.set_initial_rank.
+        rank = rank_between(rank, None) if rank else next_rank(project_doc.name)
+        doc.custom_rank = rank
+
+    bulk_insert_docs([doc for _result, doc in docs])
+
+    for result, doc in docs:
+        result.update({"status": "SUCCESS", "task": doc.name})
+
+    frappe.get_doc("Project", project_doc.name).update_project()
+    refresh_progress_counters(phases=[phase])
+    invalidate_project_board(project_doc.name)
+    invalidate_portal_snapshot(project_doc.name)
+    index_documents([doc for _result, doc in docs])
 
     return results
+
+
+def _default_phase(project):
+    # Same rule as TaskOverride._set_default_phase_if_missing / validate_task_allowed,
+    # resolved once for the batch.
+    phase = frappe.db.get_value(
+        "Project Phase",
+        {"project": project},
+        ["name", "status"],
+        order_by="creation desc",
+        as_dict=True,
+    )
+    if not phase:
+        frappe.throw(_("Please create a phase before creating a task."))
+    if phase.status != "Planned":
+        frappe.throw(
+            f"Tasks can only be created in phases with 'Planned' status. "
+            f"Phase {phase.name} status: {phase.status}"
+        )
+    return phase.name
+
+
+def _task_errors(task):
+    errors = []
+    subject = (task.get("subject") or "").strip()
+    if not subject:
+        errors.append("Subject is required")
+    elif len(subject) > 140:
+        errors.append("Subject is longer than 140 characters")
+    if task.get("priority") and task["priority"] not in ("Low", "Medium", "High", "Urgent"):
+        errors.append("Invalid priority")
+    return errors
+
+
+def _mark_drafts(results):
+    params = {}
+    status_cases = []
+    task_cases = []
+    error_cases = []
+
+    for idx, r in enumerate(results):
+        params[f"name_{idx}"] = r["draft"]
+        if r["status"] == "SUCCESS":
+            params[f"task_{idx}"] = r["task"]
+            status_cases.append(f"WHEN %(name_{idx})s THEN 'Created'")
+            task_cases.append(f"WHEN %(name_{idx})s THEN %(task_{idx})s")
+        else:
+            params[f"error_{idx}"] = r["error"]
+            status_cases.append(f"WHEN %(name_{idx})s THEN 'Failed'")
+            error_cases.append(f"WHEN %(name_{idx})s THEN %(error_{idx})s")
+
+    set_clauses = [f"status = CASE name {' '.join(status_cases)} ELSE status END"]
+    if task_cases:
+        set_clauses.append(f"created_task = CASE name {' '.join(task_cases)} ELSE created_task END")
+    if error_cases:
+        set_clauses.append(
+            f"validation_errors = CASE name {' '.join(error_cases)} ELSE validation_errors END"
+        )
+
+    params["names"] = tuple(r["draft"] for r in results)
+    params["modified"] = now()
+    params["modified_by"] = frappe.session.user
+
+    frappe.db.sql(
+        f"""
+        UPDATE `tabAI Task Draft`
+        SET {', '.join(set_clauses)}, modified = %(modified)s, modified_by = %(modified_by)s
+        WHERE name IN %(names)s
+        """,
+        params,
+    )
@@ -1,9 +1,17 @@
 import frappe
 import json
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Literal
 from pydantic import BaseModel, Field
-from openai import OpenAI
+from infintrix_atlas.bulk import bulk_insert_docs
+from infintrix_atlas.copilot.llm.provider import (
+    DEFAULT_DRAFT_CONCURRENCY,
+    get_llm_settings,
+    get_openai_client,
+)
+from infintrix_atlas.infintrix_atlas.doctype.ai_task_draft.ai_task_draft import validate_draft
 from frappe.utils import now
 import uuid
 # ============================================================
@@ -56,23 +64,33 @@ def make_ai_request(
     Makes a request to the LLM using the OpenAI SDK with Structured Outputs (Pydantic).
     Includes exponential backoff for rate limits.
     """
-    settings = frappe.get_single("Atlas Settings")
-
-    if settings.llm_provider != "OpenAI":
-        raise RuntimeError("OpenAI provider not enabled")
-
-    api_key = settings.get_password(fieldname="openai_api_key", raise_exception=True)
-
-    model = settings.openai_model or "gpt-4o-2024-08-06"
+    client, model = get_openai_client()
+
+    return _parse_with_backoff(
+        client,
+        model,
+        _messages(prompt, system_prompt),
+        response_format,
+        max_retries,
+        on_error=lambda attempt, error: frappe.log_error(
+            f"Attempt {attempt} failed\n{error}",
+            "Open AI SDK Failure",
+        ),
+    )
 
-    # Initialize the OpenAI client
-    client = OpenAI(api_key=api_key)
 
-    messages = [
+def _messages(prompt, system_prompt=""):
+    return [
         {"role": "system", "content": system_prompt.strip()},
         {"role": "user", "content": prompt},
     ]
 
+
+def _parse_with_backoff(client, model, messages, response_format, max_retries, on_error=None):
+    """
+    Retry loop behind `make_ai_request`. Makes no frappe calls of its own, so it
+    can run in worker threads; failures are reported through `on_error`.
+    """
     last_error = None
 
     for attempt in range(1, max_retries + 1):
@@ -97,11 +115,9 @@ def make_ai_request(
                 time.sleep(wait_time)
                 continue
 
-            # Log other failures
-            frappe.log_error(
-                f"Attempt {attempt} failed\n{last_error}",
-                "Open AI SDK Failure",
-            )
+            # Report other failures
+            if on_error:
+                on_error(attempt, last_error)
 
             # Small delay for generic errors before retry
             time.sleep(1)
@@ -161,10 +177,7 @@ def _feasibility_guard(prompt, project_doc):
 # ============================================================
 
 
-def _draft_tasks(intents, project_doc):
-    intent_text = "\n".join(f"- {i['text']}" for i in intents)
-
-    system_prompt = """
+DRAFT_SYSTEM_PROMPT = """
 You are the Project Task Architect.
 Generate a comprehensive, actionable task list from the given intents.
 
@@ -176,11 +189,18 @@ Rules:
 - Prefer smaller atomic tasks over large ones
 """
 
+
+def _draft_prompt(intents, project_doc):
+    intent_text = "\n".join(f"- {i['text']}" for i in intents)
+    return f"Project: {project_doc.project_name}\n\nIntents:\n{intent_text}"
+
+
+def _draft_tasks(intents, project_doc):
     try:
         # Request parsed TaskResponse object
         output = make_ai_request(
-            f"Project: {project_doc.project_name}\n\nIntents:\n{intent_text}",
-            system_prompt,
+            _draft_prompt(intents, project_doc),
+            DRAFT_SYSTEM_PROMPT,
             response_format=TaskResponse,
         )
         if output and hasattr(output, "tasks"):
@@ -191,16 +211,73 @@ Rules:
         return []
 
 
+def _draft_tasks_per_intent(intents, project_doc, concurrency=None):
+    """
+    Draft every intent in its own LLM call, at most `concurrency` at a time,
+    then merge the results. Smaller calls finish sooner and stay well under the
+    output token limit that a single call over many intents runs into.
+    """
+    client, model = get_openai_client()
+    # Settings cached before the field existed have no entry for it.
+    concurrency = concurrency or get_llm_settings().get("ai_draft_concurrency") or DEFAULT_DRAFT_CONCURRENCY
+    errors = []
+
+    def draft(intent):
+        # Runs in a worker thread: only the OpenAI client is touched here.
+        try:
+            output = _parse_with_backoff(
+                client,
+                model,
+                _messages(_draft_prompt([intent], project_doc), DRAFT_SYSTEM_PROMPT),
+                TaskResponse,
+                max_retries=5,
+                on_error=lambda attempt, error: errors.append(
+                    f"{intent['text']}: attempt {attempt} failed\n{error}"
+                ),
+            )
+        except Exception as e:
+            errors.append(f"{intent['text']}: {e}")
+            return []
+        return [t.model_dump() for t in output.tasks] if output else []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(intents)))) as pool:
+        results = list(pool.map(draft, intents))
+
+    if errors:
+        frappe.log_error("\n\n".join(errors), "AI Pipeline Error")
+
+    return _dedupe_drafts([d for drafts in results for d in drafts])
+
+
+def _dedupe_drafts(drafts):
+    """
+    Drop drafts whose subjects match after normalisation, keeping the most
+    confident one in the position of the first occurrence.
+    """
+    merged = {}
+    for d in drafts:
+        key = re.sub(r"[^a-z0-9]+", " ", d.get("subject", "").lower()).strip()
+        current = merged.get(key)
+        if current is None:
+            merged[key] = d
+        elif (d.get("confidence") or 0) > (current.get("confidence") or 0):
+            merged[key] = {**d, "id": current["id"]}
+    return list(merged.values())
+
+
 # ============================================================
 # STEP 4: TASK VALIDATION
 # ============================================================
 
 
+TASK_PRIORITIES = ("Low", "Medium", "High", "Urgent")
+
+
 def _validate_task(task):
     errors = []
     if len(task.get("subject", "")) < 5:
         errors.append("Subject too short")
-    if task.get("priority") not in ["Low", "Medium", "High", "Urgent"]:
+    if task.get("priority") not in TASK_PRIORITIES:
         errors.append("Invalid priority")
     if task.get("weight") not in [1, 2, 3, 5, 8, 13]:
         errors.append("Invalid weight")
@@ -229,10 +306,24 @@ def _blocked_response(session):
 # MAIN PIPELINE
 # ============================================================
 
+DRAFT_MODES = ("Combined", "Per Intent")
+
+
+def _record_timing(session, timings, stage, started):
+    timings[stage] = round((time.perf_counter() - started) * 1000)
+    session.stage_timings = json.dumps(timings)
+
 
 @frappe.whitelist()
-def open_ai_pipeline(project, prompt, cycle=None):
+def open_ai_pipeline(project, prompt, cycle=None, draft_mode=None):
+    """
+    `draft_mode` is "Combined" (default, one drafting call for all intents) or
+    "Per Intent" (one call per intent, run concurrently and de-duplicated).
+    """
     project_doc = frappe.get_doc("Project", project)
+    draft_mode = draft_mode or "Combined"
+    if draft_mode not in DRAFT_MODES:
+        frappe.throw(f"Draft mode must be one of: {', '.join(DRAFT_MODES)}")
 
     session = frappe.get_doc(
         {
@@ -242,12 +333,16 @@ def open_ai_pipeline(project, prompt, cycle=None):
             "cycle": cycle,
             "prompt": prompt,
             "status": "Decomposing",
+            "draft_mode": draft_mode,
             "started_on": now(),
         }
     ).insert(ignore_permissions=True)
+    timings = {}
 
     # STEP 1: Decomposition
+    started = time.perf_counter()
     intents = _decompose(prompt)
+    _record_timing(session, timings, "decompose", started)
     if not intents:
         session.status = "Blocked"
         session.blocked_reason = "No actionable intents found or AI service unavailable"
@@ -255,7 +350,9 @@ def open_ai_pipeline(project, prompt, cycle=None):
         return _blocked_response(session)
 
     # STEP 2: Guard
+    started = time.perf_counter()
     guard = _feasibility_guard(prompt, project_doc)
+    _record_timing(session, timings, "guard", started)
     if guard["status"] == "BLOCK":
         session.status = "Blocked"
         session.blocked_reason = guard["reason"]
@@ -263,7 +360,12 @@ def open_ai_pipeline(project, prompt, cycle=None):
         return _blocked_response(session)
 
     # STEP 3: Drafting
-    drafts = _draft_tasks(intents, project_doc)
+    started = time.perf_counter()
+    if draft_mode == "Per Intent":
+        drafts = _draft_tasks_per_intent(intents, project_doc)
+    else:
+        drafts = _draft_tasks(intents, project_doc)
+    _record_timing(session, timings, "draft", started)
     if not drafts:
         session.status = "Blocked"
         session.blocked_reason = "Failed to generate task drafts"
@@ -271,34 +373,44 @@ def open_ai_pipeline(project, prompt, cycle=None):
         return _blocked_response(session)
 
     # STEP 4: Validation
-    validated = []
+    started = time.perf_counter()
+    draft_docs = []
+    validations = []
     for d in drafts:
         validation = _validate_task(d)
-        doc = frappe.get_doc(
+        doc = frappe.new_doc("AI Task Draft")
+        doc.update(
             {
-                "doctype": "AI Task Draft",
                 "session": session.name,
                 "project": project,
                 "subject": d["subject"],
-                "priority": d["priority"],
+                "priority": d["priority"] if d.get("priority") in TASK_PRIORITIES else None,
                 "weight": d["weight"],
                 "confidence": d["confidence"],
                 "status": "Draft",
                 "validation_errors": ", ".join(validation["errors"]),
-            }
-        ).insert(ignore_permissions=True)
-
-        validated.append(
-            {
-                "id": doc.name,
-                "subject": doc.subject,
-                "priority": doc.priority,
-                "weight": doc.weight,
-                "confidence": doc.confidence,
-                "validation": validation,
+                "raw_ai_payload": json.dumps(d),
             }
         )
+        validate_draft(doc)
+        draft_docs.append(doc)
+        validations.append(validation)
+
+    bulk_insert_docs(draft_docs)
+
+    validated = [
+        {
+            "id": doc.name,
+            "subject": doc.subject,
+            "priority": doc.priority,
+            "weight": doc.weight,
+            "confidence": doc.confidence,
+            "validation": validation,
+        }
+        for doc, validation in zip(draft_docs, validations)
+    ]
 
+    _record_timing(session, timings, "validate", started)
     session.status = "Reviewing"
     session.save()
 
@@ -307,6 +419,7 @@ def open_ai_pipeline(project, prompt, cycle=None):
         "status": "REVIEWING",
         "intents": intents,
         "drafts": validated,
+        "timings": timings,
     }
 
 
@@ -1,6 +1,6 @@
 import frappe
 
-def send_notification(user, subject, content, document_type=None, document_name=None, icons=None):
+def send_notification(user, subject, content, document_type=None, document_name=None, icons=None, commit=True):
     """
     Creates a Notification Log entry for a specific user.
 
@@ -10,6 +10,7 @@ def send_notification(user, subject, content, document_type=None, document_name=
     :param document_type: Optional, the DocType related to the notification.
     :param document_name: Optional, the name of the document related to the notification.
     :param icons: Optional, icon HTML (e.g., '<i class="fa fa-info"></i>').
+    :param commit: Commit right away. Pass False to leave it to the caller's transaction.
     """
     if user  == frappe.session.user:
         # Don't send notifications to the user performing the action
@@ -41,7 +42,8 @@ def send_notification(user, subject, content, document_type=None, document_name=
             message={"subject": subject, "content": content}
         )
         
-        frappe.db.commit() # Commit the transaction
+        if commit:
+            frappe.db.commit() # Commit the transaction
 
     except Exception as e:
         frappe.log_error(f"Failed to create notification for {user}: {e}", "Notification Creation Error")
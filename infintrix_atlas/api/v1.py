@@ -6,14 +6,36 @@ import frappe
 from frappe.query_builder import DocType, functions as fn
 from datetime import datetime, timedelta
 import json
+import base64
 from frappe.utils import now, user, getdate, nowdate, date_diff, cint
-from infintrix_atlas.permissions import project_permission_query, task_permission_query
+from infintrix_atlas.board_cache import get_cached_board, invalidate_project_board
+from infintrix_atlas.bulk import bulk_insert_docs, bulk_insert_versions
+from infintrix_atlas.search_index import search_index
+from infintrix_atlas.typeahead import typeahead
+from infintrix_atlas.portal_snapshot import get_portal_snapshot, invalidate_portal_snapshot
+from infintrix_atlas.progress_counters import refresh_progress_counters
+from infintrix_atlas.ranking import (
+    MAX_RANK_LENGTH,
+    enqueue_rank_rebalance,
+    rank_between,
+    rebalance_project_ranks,
+)
+from infintrix_atlas.permissions import (
+    can_view_project_board,
+    clear_project_access_cache,
+    get_permitted_tasks,
+    get_project_access,
+    get_searchable_projects,
+    project_permission_query,
+    task_permission_query,
+)
 from infintrix_atlas.role_utils import (
     get_customer_portal_customers,
     has_customer_portal_access as has_customer_portal_project_access,
     has_customer_portal_task_access,
     has_projects_manager_role,
 )
+from infintrix_atlas.user_display import get_full_names
 from .utils import send_notification
 from frappe.desk.doctype.tag.tag import add_tag, remove_tag
 
@@ -49,8 +71,9 @@ def update_task_sort_order(payload=None):
         return {"success": True, "updated": 0}
 
     # Permission check (SQL update bypasses doc perms otherwise).
+    permitted = get_permitted_tasks([u["name"] for u in updates], "write")
     for u in updates:
-        if not frappe.has_permission("Task", "write", u["name"]):
+        if u["name"] not in permitted:
             frappe.throw(f"Not permitted to update Task {u['name']}")
 
     # Build CASE expressions for efficient bulk update
@@ -89,11 +112,86 @@ def update_task_sort_order(payload=None):
     """
 
     frappe.db.sql(sql, params)
+
+    # Raw UPDATE skips doc hooks, so refresh the progress counters and drop the
+    # cached boards explicitly.
+    rows = frappe.get_all(
+        "Task",
+        filters={"name": ["in", names]},
+        fields=["project", "custom_phase", "custom_cycle"],
+    )
+    if status_cases:
+        refresh_progress_counters(
+            phases={row.custom_phase for row in rows},
+            cycles={row.custom_cycle for row in rows},
+        )
     frappe.db.commit()
 
+    invalidate_project_board(*{row.project for row in rows})
+    if status_cases:
+        invalidate_portal_snapshot(*{row.project for row in rows})
+
     return {"success": True, "updated": len(names)}
 
 
+@frappe.whitelist()
+def move_task_rank(task, before=None, after=None):
+    """
+    Place `task` between `before` (the task just above it) and `after` (the task
+    just below it) on the board. Only the moved row is written; leave out a
+    neighbour at either end of the column.
+    """
+    if task not in get_permitted_tasks([task], "write"):
+        frappe.throw(f"Not permitted to update Task {task}", frappe.PermissionError)
+
+    project = frappe.db.get_value("Task", task, "project")
+    if not project:
+        frappe.throw("Only tasks that belong to a project can be ranked")
+
+    def neighbour_ranks():
+        names = [n for n in (before, after) if n]
+        rows = {
+            row.name: row
+            for row in frappe.get_all(
+                "Task",
+                filters={"name": ["in", names]},
+                fields=["name", "project", "custom_rank"],
+            )
+        } if names else {}
+        for name in names:
+            if name not in rows or rows[name].project != project:
+                frappe.throw(f"Task {name} is not on the same board")
+        return tuple(rows[n].custom_rank if n else None for n in (before, after))
+
+    lower, upper = neighbour_ranks()
+    if (before and not lower) or (after and not upper) or (lower and upper and lower >= upper):
+        # Unranked legacy rows or a tie from concurrent moves: respread first.
+        rebalance_project_ranks(project)
+        lower, upper = neighbour_ranks()
+        if lower and upper and lower >= upper:
+            frappe.throw(f"Task {before} is not above Task {after}")
+
+    rank = rank_between(lower, upper)
+    frappe.db.sql("UPDATE `tabTask` SET custom_rank = %s WHERE name = %s", (rank, task))
+    if len(rank) > MAX_RANK_LENGTH:
+        enqueue_rank_rebalance(project)
+    frappe.db.commit()
+
+    invalidate_project_board(project)
+    return {"success": True, "task": task, "rank": rank}
+
+
+@frappe.whitelist()
+def get_task_permissions(task_names, ptype="read"):
+    """Which of `task_names` the session user may access for `ptype` ("read" or "write")."""
+    task_names = frappe.parse_json(task_names) or []
+    if ptype not in ("read", "write"):
+        frappe.throw(_("Permission type must be read or write"))
+
+    permitted = get_permitted_tasks(task_names, ptype)
+    return [name for name in task_names if name in permitted]
+
+
 @frappe.whitelist(allow_guest=True)  # Adjust permissions as needed
 def get_doctype_meta(doctype_name):
     """
@@ -112,81 +210,202 @@ def switch_assignee_of_task(task_name, new_assignee):
     if not task_name:
         frappe.throw("Task is required")
 
-    task_doc = frappe.get_doc("Task", task_name)
+    if not _reassign_tasks([task_name], new_assignee)["updated"]:
+        return {"success": True, "message": "Task already assigned to this user"}
 
+    frappe.db.commit()
+    return {"success": True, "message": "Assignee updated"}
+
+
+@frappe.whitelist()
+def bulk_reassign_tasks(tasks, new_assignee):
+    """
+    Reassign many tasks at once, e.g. when someone leaves a project, in a single
+    transaction. `new_assignee` takes the same "unassigned" / "auto" values as
+    switch_assignee_of_task.
+    """
+    tasks = frappe.parse_json(tasks) or []
+    if not tasks:
+        frappe.throw("Tasks are required")
+
+    permitted = get_permitted_tasks(tasks, "write")
+    for name in tasks:
+        if name not in permitted:
+            frappe.throw(f"Not permitted to update Task {name}", frappe.PermissionError)
+
+    result = _reassign_tasks(tasks, new_assignee)
+    frappe.db.commit()
+    return {"success": True, **result}
+
+
+def _reassign_tasks(task_names, new_assignee):
+    """
+    Close the open ToDos of `task_names` and assign each task to `new_assignee`
+    with set-based writes. A task whose only open ToDo already belongs to
+    `new_assignee` is skipped. Every affected user gets one notification for
+    the whole batch. Nothing is committed here.
+    """
     if new_assignee == "unassigned":
         new_assignee = None
     elif new_assignee == "auto":
         new_assignee = frappe.session.user
 
-    # Get all existing open ToDos for this task
-    existing_todos = frappe.db.get_all(
+    task_names = list(dict.fromkeys(task_names))
+    tasks = {
+        row.name: row
+        for row in frappe.get_all(
+            "Task",
+            filters={"name": ["in", task_names]},
+            fields=["name", "subject", "project"],
+        )
+    }
+    for name in task_names:
+        if name not in tasks:
+            frappe.throw(f"Task {name} not found", frappe.DoesNotExistError)
+
+    open_todos = {}
+    for todo in frappe.get_all(
         "ToDo",
         filters={
             "reference_type": "Task",
-            "reference_name": task_name,
+            "reference_name": ["in", task_names],
             "status": "Open",
         },
-        fields=["name", "allocated_to"],
-    )
-
-    # Check if the only existing open ToDo is already assigned to new_assignee
-    if len(existing_todos) == 1 and existing_todos[0]["allocated_to"] == new_assignee:
-        return {"success": True, "message": "Task already assigned to this user"}
+        fields=["name", "reference_name", "allocated_to"],
+    ):
+        open_todos.setdefault(todo.reference_name, []).append(todo)
 
-    # Close all existing open ToDos
-    for todo in existing_todos:
-        frappe.db.set_value("ToDo", todo["name"], "status", "Closed")
+    changed = [
+        name for name in task_names
+        if [todo.allocated_to for todo in open_todos.get(name, [])] != [new_assignee]
+    ]
+    if not changed:
+        return {"updated": 0, "skipped": len(task_names)}
 
-        # Notify old assignee
-        send_notification(
-            user=todo["allocated_to"],
-            subject=f"{task_doc.subject}",
-            content=f"The task '<b>{task_doc.subject}</b>' has been removed from you.",
-            document_type="Task",
-            document_name=task_name,
-            icons='<i class="fa fa-trash"></i>',
+    closing = [todo for name in changed for todo in open_todos.get(name, [])]
+    if closing:
+        frappe.db.sql(
+            """
+            UPDATE `tabToDo`
+            SET status = 'Closed', modified = %(now)s, modified_by = %(user)s
+            WHERE name IN %(names)s
+            """,
+            {"now": now(), "user": frappe.session.user, "names": tuple(t.name for t in closing)},
         )
 
-    # Create new ToDo for new assignee only if not unassigned
     if new_assignee:
-        frappe.get_doc(
-            {
-                "doctype": "ToDo",
+        todos = []
+        for name in changed:
+            todo = frappe.new_doc("ToDo")
+            todo.update({
                 "reference_type": "Task",
-                "reference_name": task_name,
+                "reference_name": name,
                 "allocated_to": new_assignee,
                 "description": f"Task assigned to {new_assignee}",
                 "status": "Open",
-                "due_date": None,
                 "assigned_by": frappe.session.user,
-            }
-        ).insert()
+            })
+            todos.append(todo)
+        bulk_insert_docs(todos)
+
+    # ToDo.on_update keeps Task._assign in sync one row at a time; every task in
+    # the batch ends up with the same assignee list.
+    frappe.db.sql(
+        "UPDATE `tabTask` SET `_assign` = %(assign)s WHERE name IN %(names)s",
+        {"assign": json.dumps([new_assignee] if new_assignee else []), "names": tuple(changed)},
+    )
+
+    projects = {tasks[name].project for name in changed} - {None, ""}
+    if new_assignee and projects:
+        _add_project_member(new_assignee, projects)
+
+    removed = {}
+    for todo in closing:
+        removed.setdefault(todo.allocated_to, []).append(tasks[todo.reference_name])
+    for user, user_tasks in removed.items():
+        _notify_reassignment(user, user_tasks, removed=True)
+    if new_assignee:
+        _notify_reassignment(new_assignee, [tasks[name] for name in changed], removed=False)
+
+    # Raw writes skip the ToDo hooks, so the cached boards are dropped here.
+    invalidate_project_board(*projects)
+
+    return {"updated": len(changed), "skipped": len(task_names) - len(changed)}
+
 
+def _add_project_member(user, projects):
+    """Add `user` to each of `projects` they are not yet a member of."""
+    existing = set(frappe.get_all(
+        "Project User",
+        filters={"parent": ["in", list(projects)], "parenttype": "Project", "user": user},
+        pluck="parent",
+    ))
+    missing = sorted(set(projects) - existing)
+    if not missing:
+        return
+
+    last_idx = dict(frappe.db.sql(
+        """
+        SELECT parent, MAX(idx) FROM `tabProject User`
+        WHERE parenttype = 'Project' AND parent IN %(projects)s
+        GROUP BY parent
+        """,
+        {"projects": tuple(missing)},
+    ))
+    details = frappe.db.get_value("User", user, ["email", "full_name", "user_image"], as_dict=True) or {}
+
+    rows = []
+    for project in missing:
+        row = frappe.new_doc("Project User")
+        row.update({
+            "parent": project,
+            "parenttype": "Project",
+            "parentfield": "users",
+            "idx": (last_idx.get(project) or 0) + 1,
+            "user": user,
+            "email": details.get("email"),
+            "full_name": details.get("full_name"),
+            "image": details.get("user_image"),
+        })
+        rows.append(row)
+    bulk_insert_docs(rows)
+    clear_project_access_cache(rows[0])
+
+
+def _notify_reassignment(user, tasks, removed):
+    icons = '<i class="fa fa-trash"></i>' if removed else '<i class="fa fa-tasks"></i>'
+
+    if len(tasks) == 1:
+        task = tasks[0]
+        content = (
+            f"The task '<b>{task.subject}</b>' has been removed from you."
+            if removed
+            else f"You have been assigned to task '<b>{task.subject}</b>'."
+        )
         send_notification(
-            user=new_assignee,
-            subject=f"{task_doc.subject}",
-            content=f"You have been assigned to task '<b>{task_doc.subject}</b>'.",
+            user=user,
+            subject=f"{task.subject}",
+            content=content,
             document_type="Task",
-            document_name=task_name,
-            icons='<i class="fa fa-tasks"></i>',
+            document_name=task.name,
+            icons=icons,
+            commit=False,
         )
+        return
 
-        # Auto-add assignee to project users if not already present
-        if task_doc.project and not frappe.db.exists(
-            "Project User",
-            {"parent": task_doc.project, "user": new_assignee}
-        ):
-            frappe.get_doc({
-                "doctype": "Project User",
-                "parent": task_doc.project,
-                "parenttype": "Project",
-                "parentfield": "users",
-                "user": new_assignee,
-            }).insert(ignore_permissions=True)
-
-    frappe.db.commit()
-    return {"success": True, "message": "Assignee updated"}
+    shown = "".join(f"<li>{task.subject}</li>" for task in tasks[:10])
+    if len(tasks) > 10:
+        shown += f"<li>and {len(tasks) - 10} more</li>"
+    send_notification(
+        user=user,
+        subject=f"{len(tasks)} tasks {'removed from' if removed else 'assigned to'} you",
+        content=(
+            f"{'These tasks have been removed from you' if removed else 'You have been assigned to these tasks'}:"
+            f"<ul>{shown}</ul>"
+        ),
+        icons=icons,
+        commit=False,
+    )
 
 
 @frappe.whitelist()
@@ -362,7 +581,13 @@ def start_cycle(name, cycle_name, duration, start_date, end_date):
 
 
 @frappe.whitelist()
-def complete_cycle(name, move_tasks_to):
+def complete_cycle(name, move_tasks_to=None, dry_run=0):
+    """
+    Complete an active cycle, carrying its open tasks over to `move_tasks_to`
+    with one UPDATE. With `dry_run` nothing is written and the summary lists
+    what would move.
+    """
+    dry_run = cint(dry_run)
     cycle = frappe.get_doc("Cycle", name)
     if cycle.status != "Active":
         frappe.throw("Only active cycles can be completed")
@@ -373,26 +598,93 @@ def complete_cycle(name, move_tasks_to):
             "custom_cycle": name,
             "status": ["in", ["Open", "Working", "Pending Review", "Blocked"]],
         },
-        fields=["name"],
+        fields=["name", "subject", "status"],
+        order_by="name asc",
     )
 
-    if open_tasks and not move_tasks_to:
+    if open_tasks and not move_tasks_to and not dry_run:
         frappe.throw(
             f"Cycle has {len(open_tasks)} open tasks. Please specify a cycle to move them to."
         )
 
     if open_tasks and move_tasks_to:
-        for t in open_tasks:
-            task_doc = frappe.get_doc("Task", t.name)
-            task_doc.custom_cycle = move_tasks_to
-            task_doc.save()
+        _validate_carry_over_target(cycle, move_tasks_to)
+
+    summary = {
+        "success": True,
+        "cycle": name,
+        "target": move_tasks_to if open_tasks else None,
+        "moved": len(open_tasks) if move_tasks_to else 0,
+        "tasks": open_tasks,
+    }
+    if dry_run:
+        summary.update({
+            "dry_run": True,
+            "requires_target": bool(open_tasks and not move_tasks_to),
+            "message": f"{len(open_tasks)} open tasks would be moved",
+        })
+        return summary
+
+    if open_tasks:
+        _move_tasks_to_cycle(open_tasks, name, move_tasks_to)
+        invalidate_project_board(cycle.project)
+        # The move rewrote this cycle's counters; save over the fresh row.
+        cycle = frappe.get_doc("Cycle", name)
 
     cycle.status = "Completed"
     cycle.actual_end_date = frappe.utils.nowdate()
     cycle.save()
     frappe.db.commit()
 
-    return {"success": True, "message": f"Cycle {name} completed successfully"}
+    summary["message"] = f"Cycle {name} completed successfully"
+    return summary
+
+
+def _validate_carry_over_target(cycle, target):
+    # Checked once for the batch instead of per task through Task.validate.
+    if target == cycle.name:
+        frappe.throw("Open tasks cannot be moved to the cycle being completed")
+
+    target_cycle = frappe.db.get_value(
+        "Cycle", target, ["name", "project", "status"], as_dict=True)
+    if not target_cycle:
+        frappe.throw(f"Cycle {target} not found", frappe.DoesNotExistError)
+    if target_cycle.project != cycle.project:
+        frappe.throw("Open tasks can only be moved to a cycle of the same project")
+    if target_cycle.status not in ("Planned", "Active"):
+        frappe.throw(
+            f"Open tasks can only be moved to a Planned or Active cycle. "
+            f"Cycle {target} status: {target_cycle.status}"
+        )
+
+
+def _move_tasks_to_cycle(tasks, source, target):
+    names = [t.name for t in tasks]
+    frappe.db.sql(
+        """
+        UPDATE `tabTask`
+        SET custom_cycle = %(target)s, modified = %(now)s, modified_by = %(user)s
+        WHERE name IN %(names)s AND custom_cycle = %(source)s
+        """,
+        {
+            "target": target,
+            "source": source,
+            "now": now(),
+            "user": frappe.session.user,
+            "names": tuple(names),
+        },
+    )
+    # The UPDATE skips Task hooks: record the change on each timeline and
+    # refresh the progress counters of both cycles.
+    bulk_insert_versions(
+        "Task", {name: [("custom_cycle", source, target)] for name in names})
+    refresh_progress_counters(cycles=[source, target])
+
+
+# The dashboard is reloaded on every visit; a short per-user cache absorbs
+# repeat loads without making the numbers noticeably stale.
+USER_STATS_TTL = 60
+MAX_ACTIVITY_LIMIT = 50
 
 
 @frappe.whitelist()
@@ -400,6 +692,21 @@ def get_project_user_stats(user=None, activity_limit=5):
 
     user = user or frappe.session.user
 
+    try:
+        activity_limit = min(max(int(activity_limit), 1), MAX_ACTIVITY_LIMIT)
+    except (ValueError, TypeError):
+        activity_limit = 5
+
+    cache = frappe.cache()
+    key = f"atlas:user_stats:{user}:{activity_limit}"
+    stats = cache.get_value(key)
+    if stats is None:
+        stats = _build_project_user_stats(user, activity_limit)
+        cache.set_value(key, stats, expires_in_sec=USER_STATS_TTL)
+    return stats
+
+
+def _build_project_user_stats(user, activity_limit):
     # -----------------------------
     # PROJECTS
     # -----------------------------
@@ -408,7 +715,8 @@ def get_project_user_stats(user=None, activity_limit=5):
 
     projects = frappe.db.sql(
         f"""
-        SELECT * FROM `tabProject`
+        SELECT name, project_name, project_type, status, percent_complete
+        FROM `tabProject`
         {project_where}
         """,
         as_dict=True,
@@ -522,61 +830,43 @@ def get_project_user_stats(user=None, activity_limit=5):
             }
         )
 
-    try:
-        activity_limit = int(activity_limit)
-    except (ValueError, TypeError):
-        activity_limit = 5
-
-    # ---- Task Activities ----
-    task_activities_raw = frappe.db.sql(
-        """
-        SELECT 'Task' AS type, name AS doc_name, subject AS title,
-               status AS detail, owner AS user, modified AS timestamp
-        FROM `tabTask`
-        WHERE docstatus < 2 AND project IN %(projects)s
-        ORDER BY modified DESC
-        """,
-        {"projects": project_names},
-        as_dict=True,
-    )
-
-    # ---- Project Activities ----
-    project_activities_raw = frappe.db.sql(
+    # ---- Task + Project Activities ----
+    # Each branch stops after `activity_limit` rows, so only the newest few
+    # rows of either table are ever read.
+    activity_data = frappe.db.sql(
         """
-        SELECT 'Project' AS type, name AS doc_name, project_name AS title,
-               status, owner AS user, modified AS timestamp
-        FROM `tabProject`
-        WHERE docstatus < 2 AND name IN %(projects)s
-        ORDER BY modified DESC
+        (
+            SELECT 'Task' AS type, name AS doc_name, subject AS title,
+                   status AS detail, owner AS user, modified AS timestamp
+            FROM `tabTask`
+            WHERE docstatus < 2 AND project IN %(projects)s
+            ORDER BY modified DESC
+            LIMIT %(limit)s
+        )
+        UNION ALL
+        (
+            SELECT 'Project' AS type, name AS doc_name, project_name AS title,
+                   CONCAT('Status: ', COALESCE(status, '')) AS detail, owner AS user,
+                   modified AS timestamp
+            FROM `tabProject`
+            WHERE docstatus < 2 AND name IN %(projects)s
+            ORDER BY modified DESC
+            LIMIT %(limit)s
+        )
+        ORDER BY timestamp DESC
+        LIMIT %(limit)s
         """,
-        {"projects": project_names},
+        {"projects": tuple(project_names), "limit": activity_limit},
         as_dict=True,
     )
 
-    project_activities = []
-    for p in project_activities_raw:
-        project_activities.append(
-            {
-                "type": p.type,
-                "doc_name": p.doc_name,
-                "title": p.title,
-                "detail": f"Status: {p.status}",
-                "user": p.user,
-                "timestamp": p.timestamp,
-            }
-        )
-
-    activities = task_activities_raw + project_activities
-    activities.sort(key=lambda x: x["timestamp"], reverse=True)
-    activity_data = activities[:activity_limit]
-
     from frappe.utils import pretty_date
 
+    full_names = get_full_names(d["user"] for d in activity_data)
+
     recent_activities = []
     for d in activity_data:
-        user_full_name = (
-            frappe.db.get_value("User", d["user"], "full_name") or d["user"]
-        )
+        user_full_name = full_names.get(d["user"]) or d["user"]
         text = f"{user_full_name} updated {d['type']}: {d['title']} ({d['detail']})"
 
         recent_activities.append(
@@ -652,6 +942,7 @@ def update_users_on_project(project, users):
         """,
         (project,),
     )
+    clear_project_access_cache()
 
     # Add new users
     for user in users:
@@ -693,77 +984,48 @@ def update_users_on_project(project, users):
     return {"success": True, "message": "Project users updated"}
 
 
+SEARCH_ROUTES = {
+    "Task": lambda name, project: f"/tasks/kanban?project={project}&selected_task={name}",
+    "Project": lambda name, project: f"/tasks/kanban?project={name}",
+    "Cycle": lambda name, project: f"/tasks/backlog?project={project}",
+    "Requirement": lambda name, project: f"/app/requirement/{name}",
+    "Change Request": lambda name, project: f"/app/change-request/{name}",
+}
+
+
 @frappe.whitelist()
-def global_search(query: str, limit: int = 10):
+def global_search(query: str, limit: int = 20):
     if not query or len(query) < 2:
         return []
 
-    results = []
+    rows = search_index(query, limit=min(cint(limit) or 20, 100), projects=get_searchable_projects())
 
-    tasks = frappe.get_all(
-        "Task",
-        filters=[
-            ["subject", "like", f"%{query}%"],
-        ],
-        fields=["name", "subject", "project"],
-        order_by="modified desc",
-        limit=limit,
-    )
+    return [
+        _search_result(row.reference_doctype, row.reference_name, row.title, row.project, row.project_title)
+        for row in rows
+    ]
 
-    for task in tasks:
-        results.append(
-            {
-                "type": "Task",
-                "name": task.name,
-                "title": task.subject,
-                "route": f"/tasks/kanban?project={task.project}&selected_task={task.name}",
-            }
-        )
 
-    projects = frappe.get_all(
-        "Project",
-        or_filters=[
-            ["name", "like", f"%{query}%"],
-            ["project_name", "like", f"%{query}%"],
-        ],
-        fields=["name", "project_name"],
-        order_by="modified desc",
-        limit=limit,
-    )
+@frappe.whitelist()
+def search_typeahead(query: str, limit: int = 8):
+    """Title-prefix suggestions for the search box, served from cache."""
+    if not query or not query.strip():
+        return []
 
-    for project in projects:
-        results.append(
-            {
-                "type": "Project",
-                "name": project.name,
-                "title": project.project_name,
-                "route": f"/tasks/kanban?project={project.name}",
-            }
-        )
+    rows = typeahead(query, get_searchable_projects(), limit=min(cint(limit) or 8, 20))
 
-    cycles = frappe.get_all(
-        "Cycle",
-        or_filters=[
-            ["cycle_name", "like", f"%{query}%"],
-        ],
-        fields=["name", "cycle_name", "project"],
-        order_by="modified desc",
-        limit=limit,
-    )
+    return [_search_result(*row) for row in rows]
 
-    for cycle in cycles:
-        project_name = frappe.db.get_value(
-            "Project", cycle.project, "project_name") or cycle.project
-        results.append(
-            {
-                "type": "Cycle",
-                "name": cycle.name,
-                "title": f"{cycle.cycle_name} (Project: {project_name})",
-                "route": f"/tasks/backlog?project={cycle.project}",
-            }
-        )
 
-    return results
+def _search_result(doctype, name, title, project, project_title):
+    if doctype != "Project" and project_title:
+        title = f"{title} (Project: {project_title})"
+    return {
+        "type": doctype,
+        "name": name,
+        "title": title,
+        "route": SEARCH_ROUTES[doctype](name, project),
+    }
 
 
 @frappe.whitelist()
@@ -841,41 +1103,97 @@ def tasks_accountability_report(project=None):
 # file: your_app/your_app/api/task_tree.py
 
 
-@frappe.whitelist()
-def get_task_tree(project=None):
+TASK_TREE_FIELDS = ["name", "subject", "status", "priority", "project"]
 
-    fields = ["name", "subject", "status", "priority", "project"]
 
-    def get_children(parent):
-        filters = {"parent_task": parent}
-        if project:
-            filters["project"] = project
+@frappe.whitelist()
+def get_task_tree(project=None, root=None, max_depth=None):
+    """
+    Task hierarchy as nested `children` lists, loaded in a single query.
 
-        children = frappe.get_all(
+    Without `root` the whole project (or every visible task) is fetched flat and
+    linked up by `parent_task`; with `root` only that task's subtree is walked
+    with a recursive CTE. `max_depth` limits how many levels below the roots
+    are returned (0 = roots only).
+    """
+    max_depth = None if max_depth in (None, "") else cint(max_depth)
+
+    if root:
+        rows = _task_subtree_rows(root, project, max_depth)
+    else:
+        filters = {"project": project} if project else {}
+        rows = frappe.get_all(
             "Task",
             filters=filters,
-            fields=fields,
+            fields=[*TASK_TREE_FIELDS, "parent_task"],
+            limit_page_length=0,
         )
 
-        for child in children:
-            child["children"] = get_children(child["name"])
+    return _assemble_task_tree(rows, root, max_depth)
+
 
-        return children
+def _task_subtree_rows(root, project=None, max_depth=None):
+    # Depth is capped even without max_depth so a parent_task loop cannot recurse forever.
+    depth_limit = max_depth if max_depth is not None else 1000
+    conditions = ["1=1"]
+    params = {"root": root, "depth_limit": depth_limit}
 
-    # ROOT tasks → parent_task == ""
-    root_filters = {"parent_task": ""}
     if project:
-        root_filters["project"] = project
+        conditions.append("`tabTask`.project = %(project)s")
+        params["project"] = project
 
-    roots = frappe.get_all(
-        "Task",
-        filters=root_filters,
-        fields=fields,
+    permission_condition = task_permission_query(frappe.session.user)
+    if permission_condition:
+        conditions.append(permission_condition)
+
+    return frappe.db.sql(
+        f"""
+        WITH RECURSIVE subtree (name, depth) AS (
+            SELECT name, 0 FROM `tabTask` WHERE name = %(root)s
+            UNION ALL
+            SELECT child.name, subtree.depth + 1
+            FROM `tabTask` child
+            INNER JOIN subtree ON child.parent_task = subtree.name
+            WHERE subtree.depth < %(depth_limit)s
+        )
+        SELECT
+            `tabTask`.name,
+            `tabTask`.subject,
+            `tabTask`.status,
+            `tabTask`.priority,
+            `tabTask`.project,
+            `tabTask`.parent_task
+        FROM subtree
+        INNER JOIN `tabTask` ON `tabTask`.name = subtree.name
+        WHERE {" AND ".join(conditions)}
+        """,
+        params,
+        as_dict=True,
     )
 
-    for root in roots:
-        print("task:", root)
-        root["children"] = get_children(root["name"])
+
+def _assemble_task_tree(rows, root=None, max_depth=None):
+    children_by_parent = {}
+    nodes = {}
+    for row in rows:
+        parent = row.pop("parent_task", None) or ""
+        nodes[row["name"]] = (row, parent)
+        children_by_parent.setdefault(parent, []).append(row)
+
+    if root:
+        roots = [nodes[root][0]] if root in nodes else []
+    else:
+        # ROOT tasks → parent_task is empty
+        roots = children_by_parent.get("", [])
+
+    stack = [(node, 0) for node in roots]
+    while stack:
+        node, depth = stack.pop()
+        if max_depth is not None and depth >= max_depth:
+            node["children"] = []
+            continue
+        node["children"] = children_by_parent.get(node["name"], [])
+        stack.extend((child, depth + 1) for child in node["children"])
 
     return roots
 
@@ -935,6 +1253,11 @@ def get_customer_portal_data(project=None):
     if not has_customer_portal_project_access(project):
         frappe.throw(_("Not permitted to access customer portal for this project"))
 
+    return get_portal_snapshot(project)
+
+
+def build_customer_portal_data(project):
+    """Portal payload for `project`, assembled by infintrix_atlas.portal_snapshot."""
     project_doc = frappe.get_doc("Project", project)
     task_rows = frappe.get_all(
         "Task",
@@ -954,6 +1277,9 @@ def get_customer_portal_data(project=None):
             "start_date",
             "end_date",
             "completion_percentage",
+            "total_tasks",
+            "completed_tasks",
+            "open_tasks",
         ],
         order_by="sequence asc, creation asc",
     )
@@ -1014,23 +1340,12 @@ def get_customer_portal_data(project=None):
 
     total_tasks = len(task_rows)
 
-    def get_phase_completion(phase_doc_tasks, saved_completion):
-        if saved_completion is not None:
-            return int(round(float(saved_completion or 0)))
-        if not phase_doc_tasks:
-            return 0
-        completed = sum(1 for task in phase_doc_tasks if task.status == "Completed")
-        return int(round((completed / len(phase_doc_tasks)) * 100))
-
     phases = []
     active_phase = None
     next_milestone_date = None
 
     for phase_row in phase_rows:
         phase_tasks = tasks_by_phase.get(phase_row.name, [])
-        completed_tasks = sum(1 for task in phase_tasks if task.status == "Completed")
-        open_tasks = len(phase_tasks) - completed_tasks
-        completion = get_phase_completion(phase_tasks, phase_row.completion_percentage)
         deliverables = [task.subject for task in phase_tasks[:4] if task.subject]
 
         phase_item = {
@@ -1039,10 +1354,11 @@ def get_customer_portal_data(project=None):
             "start_date": phase_row.start_date,
             "end_date": phase_row.end_date,
             "status": phase_row.status,
-            "completion": completion,
-            "tasks_count": len(phase_tasks),
-            "completed_tasks": completed_tasks,
-            "open_tasks": open_tasks,
+            # Counters are maintained by infintrix_atlas.progress_counters.
+            "completion": int(round(phase_row.completion_percentage or 0)),
+            "tasks_count": phase_row.total_tasks or 0,
+            "completed_tasks": phase_row.completed_tasks or 0,
+            "open_tasks": phase_row.open_tasks or 0,
             "deliverables": deliverables,
         }
         phases.append(phase_item)
@@ -1097,6 +1413,7 @@ def get_customer_portal_data(project=None):
     else:
         overall_status = "On Track"
 
+    phase_titles = {phase_row.name: phase_row.title for phase_row in phase_rows}
     pending_actions = []
     completed_actions_count = 0
     for action in action_rows:
@@ -1115,10 +1432,12 @@ def get_customer_portal_data(project=None):
                 "due_date": action.due_date,
                 "status": action.status,
                 "priority": "High" if action.due_date and getdate(action.due_date) <= getdate(nowdate()) else "Medium",
-                "phase": frappe.db.get_value("Project Phase", action.phase, "title") if action.phase else None,
+                "phase": phase_titles.get(action.phase, action.phase) if action.phase else None,
             }
         )
 
+    requirement_owners = get_full_names(r.owner for r in requirement_rows)
+
     requirements = []
     for requirement in requirement_rows:
         requirements.append(
@@ -1127,7 +1446,7 @@ def get_customer_portal_data(project=None):
                 "title": requirement.title or requirement.name,
                 "submitted_on": requirement.modified.date() if requirement.modified else None,
                 "status": requirement.status,
-                "owner": frappe.db.get_value("User", requirement.owner, "full_name") or requirement.owner,
+                "owner": requirement_owners.get(requirement.owner) or requirement.owner,
             }
         )
 
@@ -1236,9 +1555,11 @@ def list_project_requirements(project):
         ):
             task_counts[row.custom_requirement] = row.task_count
 
+    owner_names = get_full_names(row.owner for row in requirements)
+
     for row in requirements:
         row["task_count"] = task_counts.get(row["name"], 0)
-        row["owner_name"] = frappe.db.get_value("User", row.owner, "full_name") or row.owner
+        row["owner_name"] = owner_names.get(row.owner) or row.owner
 
     return requirements
 
@@ -1362,17 +1683,20 @@ def list_project_change_requests(project):
         order_by="request_date desc, modified desc",
     )
 
-    for row in rows:
-        row["related_requirement_title"] = (
-            frappe.db.get_value("Requirement", row.related_requirement, "title")
-            if row.related_requirement
-            else None
-        )
-        row["requested_by_name"] = (
-            frappe.db.get_value("User", row.requested_by, "full_name") or row.requested_by
-            if row.requested_by
-            else None
+    requested_by_names = get_full_names(row.requested_by for row in rows)
+    requirements = list({row.related_requirement for row in rows if row.related_requirement})
+    requirement_titles = dict(
+        frappe.get_all(
+            "Requirement",
+            filters={"name": ["in", requirements]},
+            fields=["name", "title"],
+            as_list=True,
         )
+    ) if requirements else {}
+
+    for row in rows:
+        row["related_requirement_title"] = requirement_titles.get(row.related_requirement)
+        row["requested_by_name"] = requested_by_names.get(row.requested_by)
 
     return rows
 
@@ -1708,6 +2032,7 @@ def set_project_mode(project, mode):
             "UPDATE `tabProject` SET custom_execution_mode = %s WHERE name = %s",
             (mode, project)
         )
+        invalidate_project_board(project)
         # if mode == "Kanban":
         #     frappe.db.sql(
         #         "UPDATE `tabTask` SET custom_cycle = NULL WHERE project = %s",
@@ -1723,27 +2048,50 @@ def set_project_mode(project, mode):
         return {"success": False, "message": str(e)}
 
 
+def _encode_cursor(row):
+    """Opaque keyset cursor for the last row of a page ordered by (modified, name) desc."""
+    payload = json.dumps([str(row["modified"]), row["name"]])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        modified, name = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        frappe.throw(_("Invalid cursor"))
+    return modified, name
+
+
+def _after_cursor(table, cursor):
+    """Keyset predicate: rows strictly after `cursor` in (modified desc, name desc) order."""
+    modified, name = _decode_cursor(cursor)
+    return (table.modified < modified) | ((table.modified == modified) & (table.name < name))
+
+
+def _keyset_page(rows, page_size):
+    """Trim the look-ahead row fetched by keyset queries and build `next_cursor`."""
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return rows, (_encode_cursor(rows[-1]) if has_more and rows else None)
+
+
 @frappe.whitelist()
-def list_projects(filters={}, limit=20, offset=0):
+def list_projects(filters=None, limit=20, offset=0, cursor=None):
+    """
+    Projects visible to the session user, newest first.
+
+    Pass `cursor` ("" for the first page) to use keyset pagination; the response
+    is then `{"data": [...], "next_cursor": ...}` instead of a plain list.
+    """
+    filters = frappe.parse_json(filters) or {}
     Project = DocType("Project")
     Task = DocType("Task")
     ToDo = DocType("ToDo")
-    ProjectUser = DocType("Project User")
-    PortalUser = DocType("Portal User")
 
     user = frappe.session.user
     user_roles = frappe.get_roles(user)
     is_admin = "Administrator" in user_roles
     is_project_manager = has_projects_manager_role(roles=user_roles)
-    customer_portal_subquery = (
-        frappe.qb.from_(PortalUser)
-        .select(PortalUser.parent)
-        .where(
-            (PortalUser.parenttype == "Customer")
-            & (PortalUser.parentfield == "portal_users")
-            & (PortalUser.user == user)
-        )
-    )
 
     query = (
         frappe.qb.from_(Project)
@@ -1765,13 +2113,9 @@ def list_projects(filters={}, limit=20, offset=0):
     elif is_project_manager:
         # Projects Managers see projects they created, OR projects they're added to in Project User,
         # OR projects where they're assigned to any task
+        access = get_project_access(user)
         query = query.where(
-            (Project.owner == user) |
-            (Project.name.isin(
-                frappe.qb.from_(ProjectUser)
-                .select(ProjectUser.parent)
-                .where(ProjectUser.user == user)
-            )) |
+            (Project.name.isin(access["owned"] + access["member"] or [""])) |
             (Project.name.isin(
                 frappe.qb.from_(Task)
                 .inner_join(ToDo).on(
@@ -1784,13 +2128,9 @@ def list_projects(filters={}, limit=20, offset=0):
         )
     else:
         # Regular users see projects they belong to directly or through their customer portal access
+        access = get_project_access(user)
         query = query.where(
-            (Project.name.isin(
-                frappe.qb.from_(ProjectUser)
-                .select(ProjectUser.parent)
-                .where(ProjectUser.user == user)
-            )) |
-            (Project.customer.isin(customer_portal_subquery))
+            Project.name.isin(access["member"] + access["customer"] or [""])
         )
 
     # Apply filters
@@ -1800,6 +2140,16 @@ def list_projects(filters={}, limit=20, offset=0):
         elif key == "project_type":
             query = query.where(Project.project_type == value)
 
+    if cursor is not None:
+        page_size = cint(limit) or 20
+        if cursor:
+            query = query.where(_after_cursor(Project, cursor))
+        query = query.limit(page_size + 1).orderby(
+            Project.modified, order=frappe.qb.desc).orderby(
+            Project.name, order=frappe.qb.desc)
+        projects, next_cursor = _keyset_page(query.run(as_dict=True), page_size)
+        return {"data": projects, "next_cursor": next_cursor}
+
     query = query.limit(limit).offset(offset).orderby(
         Project.modified, order=frappe.qb.desc)
 
@@ -1808,35 +2158,77 @@ def list_projects(filters={}, limit=20, offset=0):
 
 
 @frappe.whitelist()
-def list_tasks(project, group_by=None, filters=None, limit=None, offset=0):
+def list_tasks(project, group_by=None, filters=None, limit=None, offset=0, cursor=None):
+    """
+    Parent tasks of a project, newest first, optionally grouped by `group_by`.
 
-    project_execution_mode = frappe.db.get_value(
-        "Project", project, "custom_execution_mode") or "Kanban"
-    isScrum = project_execution_mode == "Scrum"
+    Pass `cursor` ("" for the first page) to use keyset pagination on
+    (modified, name); the response is then `{"data": [...], "next_cursor": ...}`.
+    """
+    filters = frappe.parse_json(filters) or {}
+    filters.update({"project": project})
 
-    filters = json.loads(filters) or {}
-    print("filters received:", filters, type(filters))
+    if cursor is not None:
+        if not can_view_project_board(project):
+            return {"data": [], "next_cursor": None}
+
+        page_size = cint(limit) or 50
+        rows = get_cached_board(
+            project,
+            "list_tasks_page",
+            lambda: _build_task_list(filters, page_size + 1, after=cursor or None),
+            filters=filters,
+            page_size=page_size,
+            cursor=cursor,
+        )
+        tasks, next_cursor = _keyset_page(rows, page_size)
+        return {"data": _group_tasks(tasks, group_by), "next_cursor": next_cursor}
+
+    if not can_view_project_board(project):
+        return []
+
+    tasks = get_cached_board(
+        project,
+        "list_tasks",
+        lambda: _build_task_list(filters, limit, offset),
+        filters=filters,
+        limit=limit,
+        offset=offset,
+    )
+
+    return _group_tasks(tasks, group_by)
 
-    filters.update({"project": project})
-    filters.update(filters)
-    # if isScrum:
-    #     active_cycle = frappe.db.get_value(
-    #         "Cycle",
-    #         {"project": project, "status": "Active"},
-    #         "name"
-    #     )
-    #     filters.update({"custom_cycle": active_cycle})
-    # else:
-    #     # For Kanban mode, don't filter by cycle
-    #     pass
 
+def _group_tasks(tasks, group_by=None):
+    # Group tasks by specified field
+    if group_by:
+        grouped_data = {}
+        for task in tasks:
+            group_key = task.get(group_by, "Ungrouped")
+            if group_key not in grouped_data:
+                grouped_data[group_key] = {
+                    "name": str(group_key),
+                    "id": str(group_key),
+                    "title": str(group_key),
+                    group_by: group_key,
+                    "children": []
+                }
+            grouped_data[group_key]["children"].append(task)
+
+        return list(grouped_data.values())
+
+    return tasks
+
+
+def _build_task_list(filters, limit=None, offset=0, after=None):
+    """
+    Parent tasks of a project matching `filters`; permission checks are left to the caller.
+
+    With `after` (a keyset cursor) rows continue past that cursor instead of using OFFSET.
+    """
     Task = DocType("Task")
     ToDo = DocType("ToDo")
     Project = DocType("Project")
-
-    ProjectUser = DocType("Project User")
-    PortalUser = DocType("Portal User")
-
     ProjectPhase = DocType("Project Phase")
 
     query = (
@@ -1848,6 +2240,7 @@ def list_tasks(project, group_by=None, filters=None, limit=None, offset=0):
             Task.status,
             Task.type,
             Task.custom_cycle.as_("cycle"),
+            Task.custom_rank,
             Task.priority,
             Task.modified,
             Task.project,
@@ -1866,51 +2259,11 @@ def list_tasks(project, group_by=None, filters=None, limit=None, offset=0):
             & (ToDo.status == "Open")
         )
     )
-    # Permission-based filtering
-    user = frappe.session.user
-    user_roles = frappe.get_roles(user)
-    is_admin = "Administrator" in user_roles
-    is_project_manager = has_projects_manager_role(roles=user_roles)
-    customer_portal_subquery = (
-        frappe.qb.from_(PortalUser)
-        .select(PortalUser.parent)
-        .where(
-            (PortalUser.parenttype == "Customer")
-            & (PortalUser.parentfield == "portal_users")
-            & (PortalUser.user == user)
-        )
-    )
-
-    if not is_admin:
-        if is_project_manager:
-            # Projects Manager sees tasks from projects they own OR are added to in Project User
-            query = query.where(
-                (Project.owner == user) |
-                (Project.name.isin(
-                    frappe.qb.from_(ProjectUser)
-                    .select(ProjectUser.parent)
-                    .where(ProjectUser.user == user)
-                ))
-            )
-        else:
-            # Project User sees tasks from projects they're assigned to or customer-owned projects they can access
-            query = query.where(
-                (Project.name.isin(
-                    frappe.qb.from_(ProjectUser)
-                    .select(ProjectUser.parent)
-                    .where(ProjectUser.user == user)
-                )) |
-                (Project.customer.isin(customer_portal_subquery))
-            )
-
-    if limit:
-        query = query.limit(limit).offset(offset)
 
-    query = query.groupby(Task.name).orderby(
-        Task.modified, order=frappe.qb.desc)
-    # Only return parent tasks (exclude subtasks)
-    # query = query.where((Task.parent_task.isnull()) | (Task.parent_task == ""))
-    # tasks = query.run(as_dict=True)
+    if after:
+        query = query.where(_after_cursor(Task, after)).limit(cint(limit))
+    elif limit:
+        query = query.limit(cint(limit)).offset(cint(offset))
 
     # Apply filters
     for key, value in filters.items():
@@ -1931,31 +2284,13 @@ def list_tasks(project, group_by=None, filters=None, limit=None, offset=0):
             query = query.where(Task.status == value)
 
     query = query.groupby(Task.name).orderby(
-        Task.modified, order=frappe.qb.desc)
+        Task.modified, order=frappe.qb.desc).orderby(
+        Task.name, order=frappe.qb.desc)
 
     # Only return parent tasks (exclude subtasks)
     query = query.where((Task.parent_task.isnull()))
 
-    tasks = query.run(as_dict=True)
-
-    # Group tasks by specified field
-    if group_by:
-        grouped_data = {}
-        for task in tasks:
-            group_key = task.get(group_by, "Ungrouped")
-            if group_key not in grouped_data:
-                grouped_data[group_key] = {
-                    "name": str(group_key),
-                    "id": str(group_key),
-                    "title": str(group_key),
-                    group_by: group_key,
-                    "children": []
-                }
-            grouped_data[group_key]["children"].append(task)
-
-        return list(grouped_data.values())
-
-    return tasks
+    return query.run(as_dict=True)
 
 
 @frappe.whitelist()
@@ -1993,45 +2328,12 @@ def list_subtasks(parent_task):
     return subtasks
 
 
-@frappe.whitelist()
-def backlog_with_phases(project=None):
-    if not project:
-        return {"error": "Project parameter is required"}
-    isScrum = frappe.db.get_value(
-        "Project", project, "custom_execution_mode") == "Scrum"
-    filters = {"project": project}
+def _project_task_rows(project):
+    """All tasks of a project with their open assignees, newest first (one query)."""
     Task = DocType("Task")
     ToDo = DocType("ToDo")
-    active_phase = frappe.db.get_value(
-        "Project Phase",
-        {"project": project, "status": "Active"},
-        ["name", "title", "start_date", "end_date", "status"],
-        as_dict=True,
-    )
-    phases = frappe.qb.from_(DocType("Project Phase")).select(
-        DocType("Project Phase").name,
-        DocType("Project Phase").title,
-        DocType("Project Phase").start_date,
-        DocType("Project Phase").end_date,
-        DocType("Project Phase").status,
-        DocType("Project Phase").sequence,
-    ).where(DocType("Project Phase").project == project).orderby(DocType("Project Phase").sequence, order=frappe.qb.asc).run(as_dict=True)
-
-    # Calculate phase_progress for each phase
-    for phase in phases:
-        total_tasks = frappe.db.count(
-            "Task",
-            filters={"custom_phase": phase["name"], "project": project}
-        )
-        completed_tasks = frappe.db.count(
-            "Task",
-            filters={"custom_phase": phase["name"],
-                     "project": project, "status": "Completed"}
-        )
-        phase["phase_progress"] = round(
-            (completed_tasks / total_tasks * 100)) if total_tasks > 0 else 0
 
-    all_tasks = frappe.qb.from_(Task).select(
+    return frappe.qb.from_(Task).select(
         Task.name.as_("id"),
         Task.name,
         Task.subject,
@@ -2047,67 +2349,100 @@ def backlog_with_phases(project=None):
         (ToDo.reference_name == Task.name)
         & (ToDo.reference_type == "Task")
         & (ToDo.status == "Open")
-    ).where(Task.project == project).groupby(Task.name).orderby(Task.modified, order=frappe.qb
-                                                                .desc).run(as_dict=True)
+    ).where(Task.project == project).groupby(Task.name).orderby(Task.modified, order=frappe.qb.desc).run(as_dict=True)
+
+
+@frappe.whitelist()
+def backlog_with_phases(project=None):
+    if not project:
+        return {"error": "Project parameter is required"}
+
+    if not can_view_project_board(project):
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+    return get_cached_board(
+        project, "backlog_with_phases", lambda: _build_backlog_with_phases(project)
+    )
+
+
+def _build_backlog_with_phases(project):
+    isScrum = frappe.db.get_value(
+        "Project", project, "custom_execution_mode") == "Scrum"
+
+    ProjectPhase = DocType("Project Phase")
+    Cycle = DocType("Cycle")
 
+    # Phases, cycles and tasks are each loaded once; everything else is
+    # assembled in memory so the query count does not grow with phases.
+    phases = frappe.qb.from_(ProjectPhase).select(
+        ProjectPhase.name,
+        ProjectPhase.title,
+        ProjectPhase.start_date,
+        ProjectPhase.end_date,
+        ProjectPhase.status,
+        ProjectPhase.sequence,
+        ProjectPhase.total_tasks,
+        ProjectPhase.completed_tasks,
+        ProjectPhase.open_tasks,
+        ProjectPhase.total_story_points,
+        ProjectPhase.completed_story_points,
+        ProjectPhase.completion_percentage,
+    ).where(ProjectPhase.project == project).orderby(ProjectPhase.sequence, order=frappe.qb.asc).run(as_dict=True)
+
+    cycles = frappe.qb.from_(Cycle).select(
+        Cycle.name,
+        Cycle.cycle_name,
+        Cycle.start_date,
+        Cycle.end_date,
+        Cycle.status,
+        Cycle.phase,
+    ).where(Cycle.project == project).orderby(Cycle.start_date, order=frappe.qb.asc).run(as_dict=True)
+
+    all_tasks = _project_task_rows(project)
+
+    tasks_in_phase = {phase["name"]: [] for phase in phases}
+    cycles_by_tasks = {}
+    for task in all_tasks:
+        phase_name = task.get("custom_phase")
+        if phase_name in tasks_in_phase:
+            tasks_in_phase[phase_name].append(task)
+
+        cycle = task.get("cycle")
+        if cycle:
+            cycles_by_tasks.setdefault(cycle, []).append(task)
+
+    cycles_by_phase = {phase["name"]: [] for phase in phases}
+    for cycle in cycles:
+        phase_name = cycle.pop("phase")
+        if phase_name in cycles_by_phase:
+            cycles_by_phase[phase_name].append(
+                {**cycle, "tasks": cycles_by_tasks.get(cycle["name"], [])}
+            )
+
+    active_phase = None
     tasks_by_phases = {}
-    cycles_by_phase = {}
+    backlog_by_phase = {}
     for phase in phases:
-        phase_tasks = frappe.qb.from_(Task).select(
-            Task.name.as_("id"),
-            Task.name,
-            Task.subject,
-            Task.status,
-            Task.type,
-            Task.custom_cycle.as_("cycle"),
-            Task.priority,
-            Task.modified,
-            Task.project,
-            Task.custom_phase,
-            fn.GroupConcat(ToDo.allocated_to).as_("assignee"),
-        ).left_join(ToDo).on(
-            (ToDo.reference_name == Task.name)
-            & (ToDo.reference_type == "Task")
-            & (ToDo.status == "Open")
-        ).where(
-            (Task.project == project) &
-            (Task.custom_phase == phase["name"])
-        ).groupby(Task.name).orderby(Task.modified, order=frappe.qb.desc).run(as_dict=True)
-        phase_cycles = frappe.qb.from_(DocType("Cycle")).select(
-            DocType("Cycle").name,
-            DocType("Cycle").cycle_name,
-            DocType("Cycle").start_date,
-            DocType("Cycle").end_date,
-            DocType("Cycle").status,
-        ).where(
-            (DocType("Cycle").project == project) &
-            (DocType("Cycle").phase == phase["name"])
-        ).orderby(DocType("Cycle").start_date, order=frappe.qb.asc).run(as_dict=True)
-        cycles_by_phase[phase["name"]] = phase_cycles
+        phase_tasks = tasks_in_phase[phase["name"]]
+        # Maintained by infintrix_atlas.progress_counters.
+        phase["phase_progress"] = round(phase.pop("completion_percentage") or 0)
+
+        if active_phase is None and phase["status"] == "Active":
+            active_phase = {
+                key: phase[key] for key in ("name", "title", "start_date", "end_date", "status")
+            }
+
         tasks_by_phases[phase["name"]] = {
             "phase": phase,
             "tasks": phase_tasks
         }
+        backlog_by_phase[phase["name"]] = [
+            t for t in phase_tasks
+            if (not t["cycle"] if isScrum else True) and t["status"] == "Open"
+        ]
 
-    cycles = frappe.qb.from_(DocType("Cycle")).select(
-        DocType("Cycle").name,
-        DocType("Cycle").cycle_name,
-        DocType("Cycle").start_date,
-        DocType("Cycle").end_date,
-        DocType("Cycle").status,
-    ).where(DocType("Cycle").project == project).orderby(DocType("Cycle").start_date, order=frappe.qb.asc).run(as_dict=True)
     active_cycle = next((c for c in cycles if c["status"] == "Active"), None)
 
-    cycles_by_tasks = {}
-    for task in all_tasks:
-        cycle = task.get("cycle")
-        if cycle:
-            if cycle not in cycles_by_tasks:
-                cycles_by_tasks[cycle] = []
-            cycles_by_tasks[cycle].append(task)
-    for phase_name, phase_cycles in cycles_by_phase.items():
-        for cycle in phase_cycles:
-            cycle["tasks"] = cycles_by_tasks.get(cycle["name"], [])
     return {
         "is_scrum": isScrum,
         "active_phase": active_phase,
@@ -2118,23 +2453,19 @@ def backlog_with_phases(project=None):
         "cycles": cycles,
         "active_cycle_name": active_cycle["cycle_name"] if active_cycle else None,
         "cycles_by_tasks": cycles_by_tasks,
-        "backlog_by_phase": {
-            phase["name"]: [t for t in tasks_by_phases[phase["name"]]
-                            ["tasks"] if (not t["cycle"] if isScrum else True) and t["status"] == "Open"]
-            for phase in phases
-        }
-
+        "backlog_by_phase": backlog_by_phase,
     }
-    # open_tasks =
 
 
 @frappe.whitelist()
 def backlog(project=None):
-    user = frappe.session.user
-    user_roles = frappe.get_roles(user)
-    is_admin = "Administrator" in user_roles
-    is_project_manager = has_projects_manager_role(roles=user_roles)
+    if not can_view_project_board(project):
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
 
+    return get_cached_board(project, "backlog", lambda: _build_backlog(project))
+
+
+def _build_backlog(project):
     project_execution_mode = frappe.db.get_value(
         "Project", project, "custom_execution_mode") or "Kanban"
 
@@ -2659,72 +2990,163 @@ def remove_task(task_name):
 @frappe.whitelist()
 def _move_task(task_name, target_type, target_id):
     """Move a single task. target_type: 'cycle', 'backlog', or 'phase'"""
-    task_doc = frappe.get_doc("Task", task_name)
-    project_doc = frappe.get_doc("Project", task_doc.project)
+    # _move_tasks writes with a raw UPDATE, so check what Task.save() used to.
+    if task_name not in get_permitted_tasks([task_name], "write"):
+        return {"success": False, "message": f"Not permitted to move Task {task_name}"}
 
-    if target_type == "cycle":
-        cycle_name = target_id
+    result = _move_tasks([task_name], target_type, target_id)[0]
+    frappe.db.commit()
+    return {"success": result["success"], "message": result["message"]}
 
-        if project_doc.custom_execution_mode != "Scrum":
-            return {"success": False, "message": f"Project '{project_doc.project_name}' is not in Scrum mode"}
 
-        if task_doc.custom_cycle == cycle_name:
-            return {"success": False, "message": f"Task '{task_doc.subject}' is already in cycle '{cycle_name}'"}
+def _move_tasks(task_names, target_type, target_id):
+    """
+    Move tasks to a cycle, to the backlog or to a phase (target_type 'cycle',
+    'backlog' or 'phase') and return one result per task. Tasks, projects and
+    cycles are each read with one query and every allowed move is written with
+    one UPDATE, however many tasks are selected. Nothing is committed here.
+    """
+    if target_type not in ("cycle", "backlog", "phase"):
+        return [
+            {"task": name, "success": False, "message": "Unknown target type"}
+            for name in task_names
+        ]
 
-        active_cycle = frappe.db.get_value("Cycle", {"project": project_doc.name, "status": "Active"}, "name")
-        if active_cycle and task_doc.custom_cycle == active_cycle and cycle_name != active_cycle:
-            return {"success": False, "message": f"Cannot move tasks out of active cycle '{active_cycle}'. Please complete it first."}
+    tasks = {
+        row.name: row
+        for row in frappe.get_all(
+            "Task",
+            filters={"name": ["in", list(task_names)]},
+            fields=["name", "subject", "project", "custom_cycle", "custom_phase"],
+        )
+    }
+    project_names = list({t.project for t in tasks.values()} - {None, ""})
+    projects = {
+        row.name: row
+        for row in frappe.get_all(
+            "Project",
+            filters={"name": ["in", project_names]},
+            fields=["name", "project_name", "custom_execution_mode"],
+        )
+    } if project_names else {}
+
+    cycles = {}
+    active_cycles = {}
+    if target_type != "phase" and projects:
+        cycle_names = {t.custom_cycle for t in tasks.values() if t.custom_cycle}
+        if target_type == "cycle" and target_id:
+            cycle_names.add(target_id)
+        for row in frappe.db.sql(
+            """
+            SELECT name, cycle_name, project, status
+            FROM `tabCycle`
+            WHERE name IN %(names)s
+                OR (project IN %(projects)s AND status = 'Active')
+            """,
+            {"names": tuple(cycle_names) or ("",), "projects": tuple(projects)},
+            as_dict=True,
+        ):
+            cycles[row.name] = row
+            if row.status == "Active":
+                active_cycles.setdefault(row.project, row.name)
 
-        if task_doc.custom_cycle:
-            current_cycle = frappe.get_doc("Cycle", task_doc.custom_cycle)
-            if current_cycle.status == "Completed":
-                return {"success": False, "message": f"Cannot move tasks out of completed cycle '{current_cycle.cycle_name}'."}
+    phase = None
+    if target_type == "phase" and target_id:
+        phase = frappe.db.get_value(
+            "Project Phase", target_id, ["name", "title", "project"], as_dict=True)
 
-        if cycle_name:
-            cycle_doc = frappe.get_doc("Cycle", cycle_name)
-            if cycle_doc.project != project_doc.name:
-                return {"success": False, "message": f"Cycle '{cycle_doc.cycle_name}' does not belong to project '{project_doc.project_name}'"}
-            if cycle_doc.status == "Completed":
-                return {"success": False, "message": f"Cannot move tasks into completed cycle '{cycle_doc.cycle_name}'."}
+    results = []
+    moving = []
+    for name in task_names:
+        task = tasks.get(name)
+        if not task:
+            results.append({"task": name, "success": False, "message": f"Task {name} not found"})
+            continue
 
-        task_doc.custom_cycle = cycle_name
-        task_doc.save()
-        frappe.db.commit()
-        return {"success": True, "message": f"Task '{task_doc.subject}' moved to '{cycle_name or 'Backlog'}'"}
+        project = projects.get(task.project)
+        error = _backlog_move_error(
+            task, project, target_type, target_id, cycles, active_cycles.get(task.project), phase)
+        if error:
+            results.append({"task": name, "success": False, "message": error})
+            continue
 
-    elif target_type == "backlog":
-        if project_doc.custom_execution_mode != "Scrum":
-            return {"success": False, "message": f"Project '{project_doc.project_name}' is not in Scrum mode"}
+        if target_type == "cycle":
+            message = f"Task '{task.subject}' moved to '{target_id or 'Backlog'}'"
+        elif target_type == "backlog":
+            message = f"Task '{task.subject}' moved to backlog"
+        else:
+            message = f"Task '{task.subject}' moved to phase '{phase.title if phase else 'None'}'"
+        results.append({"task": name, "success": True, "message": message})
+        moving.append(task)
 
-        active_cycle = frappe.db.get_value("Cycle", {"project": project_doc.name, "status": "Active"}, "name")
-        if active_cycle and task_doc.custom_cycle == active_cycle:
-            return {"success": False, "message": f"Cannot move tasks out of active cycle '{active_cycle}'. Please complete it first."}
+    if moving:
+        field = "custom_phase" if target_type == "phase" else "custom_cycle"
+        value = (target_id or None) if target_type != "backlog" else None
+        frappe.db.sql(
+            f"""
+            UPDATE `tabTask`
+            SET `{field}` = %(value)s, modified = %(now)s, modified_by = %(user)s
+            WHERE name IN %(names)s
+            """,
+            {
+                "value": value,
+                "now": now(),
+                "user": frappe.session.user,
+                "names": tuple(t.name for t in moving),
+            },
+        )
 
-        if task_doc.custom_cycle:
-            current_cycle = frappe.get_doc("Cycle", task_doc.custom_cycle)
-            if current_cycle.status == "Completed":
-                return {"success": False, "message": f"Cannot move tasks out of completed cycle '{current_cycle.cycle_name}'."}
+        # The UPDATE skips Task hooks: record the change on each timeline and
+        # refresh the counters on both sides of the move.
+        bulk_insert_versions("Task", {t.name: [(field, t.get(field), value)] for t in moving})
+        parents = {t.get(field) for t in moving} | {value}
+        if field == "custom_phase":
+            refresh_progress_counters(phases=parents)
+            invalidate_portal_snapshot(*{t.project for t in moving})
+        else:
+            refresh_progress_counters(cycles=parents)
+        invalidate_project_board(*{t.project for t in moving})
 
-        task_doc.custom_cycle = None
-        task_doc.save()
-        frappe.db.commit()
-        return {"success": True, "message": f"Task '{task_doc.subject}' moved to backlog"}
-
-    elif target_type == "phase":
-        phase_name = target_id
-        phase_title = "None"
-        if phase_name:
-            phase_doc = frappe.get_doc("Project Phase", phase_name)
-            if phase_doc.project != project_doc.name:
-                return {"success": False, "message": f"Phase '{phase_doc.title}' does not belong to project '{project_doc.project_name}'"}
-            phase_title = phase_doc.title
-
-        task_doc.custom_phase = phase_name
-        task_doc.save()
-        frappe.db.commit()
-        return {"success": True, "message": f"Task '{task_doc.subject}' moved to phase '{phase_title}'"}
+    return results
+
+
+def _backlog_move_error(task, project, target_type, target_id, cycles, active_cycle, phase):
+    """Why `task` cannot be moved, or None. Same rules _move_task applied per task."""
+    if not project:
+        return f"Task '{task.subject}' does not belong to a project"
+
+    if target_type == "phase":
+        if target_id and not phase:
+            return f"Phase {target_id} not found"
+        if phase and phase.project != project.name:
+            return f"Phase '{phase.title}' does not belong to project '{project.project_name}'"
+        return None
+
+    if project.custom_execution_mode != "Scrum":
+        return f"Project '{project.project_name}' is not in Scrum mode"
+
+    if target_type == "cycle" and task.custom_cycle == target_id:
+        return f"Task '{task.subject}' is already in cycle '{target_id}'"
+
+    leaving_active = target_type == "backlog" or target_id != active_cycle
+    if active_cycle and task.custom_cycle == active_cycle and leaving_active:
+        return f"Cannot move tasks out of active cycle '{active_cycle}'. Please complete it first."
+
+    current_cycle = cycles.get(task.custom_cycle) if task.custom_cycle else None
+    if current_cycle and current_cycle.status == "Completed":
+        return f"Cannot move tasks out of completed cycle '{current_cycle.cycle_name}'."
+
+    if target_type == "cycle" and target_id:
+        cycle = cycles.get(target_id)
+        if not cycle:
+            return f"Cycle {target_id} not found"
+        if cycle.project != project.name:
+            return f"Cycle '{cycle.cycle_name}' does not belong to project '{project.project_name}'"
+        if cycle.status == "Completed":
+            return f"Cannot move tasks into completed cycle '{cycle.cycle_name}'."
+
+    return None
 
-    return {"success": False, "message": "Unknown target type"}
 
 @frappe.whitelist()
 def set_backlog_position(type, task_name, target_id, task_names=None):
@@ -2732,21 +3154,29 @@ def set_backlog_position(type, task_name, target_id, task_names=None):
         task_names = frappe.parse_json(task_names)
     else:
         task_names = [task_name]
+    task_names = list(dict.fromkeys(task_names))
 
-    first_error = None
-    moved = 0
-    for name in task_names:
-        result = _move_task(name, type, target_id)
-        if result.get("success"):
-            moved += 1
-        elif first_error is None:
-            first_error = result
+    permitted = get_permitted_tasks(task_names, "write")
+    results = {
+        name: {"task": name, "success": False, "message": f"Not permitted to move Task {name}"}
+        for name in task_names
+        if name not in permitted
+    }
+    allowed = [name for name in task_names if name in permitted]
+    if allowed:
+        for result in _move_tasks(allowed, type, target_id):
+            results[result["task"]] = result
+        frappe.db.commit()
 
+    results = [results[name] for name in task_names]
+    moved = sum(1 for r in results if r["success"])
     if moved > 0:
-        return {"success": True, "message": f"{moved} task(s) moved successfully"}
-    if first_error:
-        return first_error
-    return {"success": False, "message": "No tasks were moved"}
+        message = f"{moved} task(s) moved successfully"
+    else:
+        first_error = next((r for r in results if not r["success"]), None)
+        message = first_error["message"] if first_error else "No tasks were moved"
+
+    return {"success": moved > 0, "message": message, "moved": moved, "results": results}
 
 def set_task_status(task_name, new_status):
     try:
@@ -0,0 +1,68 @@
+"""
+Ad-hoc performance probes for Atlas endpoints.
+
+Run against a site with real data, e.g.:
+
+    bench --site <site> execute infintrix_atlas.benchmarks.backlog_with_phases
+    bench --site <site> execute infintrix_atlas.benchmarks.backlog_with_phases --kwargs "{'runs': 10}"
+"""
+
+import time
+from contextlib import contextmanager
+
+import frappe
+
+
+@contextmanager
+def count_queries():
+    """Count every statement sent through `frappe.db.sql` inside the block."""
+    counter = {"queries": 0}
+    original_sql = frappe.db.sql
+
+    def counting_sql(*args, **kwargs):
+        counter["queries"] += 1
+        return original_sql(*args, **kwargs)
+
+    frappe.db.sql = counting_sql
+    try:
+        yield counter
+    finally:
+        frappe.db.sql = original_sql
+
+
+def backlog_with_phases(project=None, runs=5):
+    """
+    Time `api.v1.backlog_with_phases` for one project (or every project) and
+    print phase count, task count, queries per call and mean wall time, so it
+    is easy to see that the query count stays flat as phases grow.
+    """
+    from infintrix_atlas.api.v1 import backlog_with_phases as endpoint
+
+    projects = [project] if project else frappe.get_all("Project", pluck="name")
+    runs = max(int(runs), 1)
+    results = []
+
+    for name in projects:
+        phase_count = frappe.db.count("Project Phase", {"project": name})
+        task_count = frappe.db.count("Task", {"project": name})
+
+        with count_queries() as counter:
+            started = time.perf_counter()
+            for _ in range(runs):
+                endpoint(project=name)
+            elapsed = time.perf_counter() - started
+
+        row = {
+            "project": name,
+            "phases": phase_count,
+            "tasks": task_count,
+            "queries_per_call": counter["queries"] / runs,
+            "mean_ms": round(elapsed / runs * 1000, 2),
+        }
+        results.append(row)
+        print(
+            f"{name}: phases={phase_count} tasks={task_count} "
+            f"queries/call={row['queries_per_call']:.0f} mean={row['mean_ms']}ms"
+        )
+
+    return results
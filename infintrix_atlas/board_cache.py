@@ -0,0 +1,82 @@
+import hashlib
+import json
+
+import frappe
+
+
+# Assembled board/backlog payloads are cached per project in Redis. Each project
+# has a version token that is part of every payload key; any change to a Task,
+# ToDo, Cycle or Project Phase drops the token, so stale payloads simply stop
+# being addressed and age out through their TTL.
+BOARD_CACHE_TTL = 10 * 60
+
+
+def _version_key(project):
+    return f"atlas:board_version:{project}"
+
+
+def get_board_version(project):
+    cache = frappe.cache()
+    version = cache.get_value(_version_key(project))
+    if not version:
+        version = frappe.generate_hash(length=10)
+        cache.set_value(_version_key(project), version)
+    return version
+
+
+def get_cached_board(project, view, builder, **params):
+    """
+    Return the payload for `view` of `project`, building it with `builder()` on a miss.
+
+    The payload must not depend on the requesting user; callers apply permission
+    checks themselves so a single build serves every member of the project.
+    """
+    params_hash = hashlib.md5(
+        json.dumps(params, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    key = f"atlas:board:{project}:{get_board_version(project)}:{view}:{params_hash}"
+
+    cache = frappe.cache()
+    payload = cache.get_value(key)
+    if payload is None:
+        payload = builder()
+        cache.set_value(key, payload, expires_in_sec=BOARD_CACHE_TTL)
+    return payload
+
+
+def invalidate_project_board(*projects):
+    cache = frappe.cache()
+    for project in {p for p in projects if p}:
+        cache.delete_value(_version_key(project))
+
+
+def clear_all_board_caches():
+    frappe.cache().delete_keys("atlas:board")
+
+
+def _projects_for_doc(doc):
+    if doc.doctype == "Project":
+        return [doc.name]
+
+    if doc.doctype == "ToDo":
+        if doc.reference_type != "Task" or not doc.reference_name:
+            return []
+        return [frappe.db.get_value("Task", doc.reference_name, "project")]
+
+    projects = [doc.get("project")]
+    before = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+    if before:
+        projects.append(before.get("project"))
+    return projects
+
+
+def invalidate_board_cache(doc, method=None):
+    """doc_events hook for Task, ToDo, Cycle, Project Phase and Project."""
+    projects = _projects_for_doc(doc)
+    if not projects:
+        return
+
+    invalidate_project_board(*projects)
+    # Readers in other requests may rebuild from pre-commit data in between,
+    # so drop the version again once the transaction is visible.
+    frappe.db.after_commit.add(lambda: invalidate_project_board(*projects))
@@ -0,0 +1,63 @@
+import frappe
+from frappe.model.naming import set_new_name
+from frappe.utils import now
+
+
+def bulk_insert_docs(docs, chunk_size=200):
+    """
+    Write unsaved documents of one doctype with multi-row INSERTs.
+
+    Names come from the doctype's own naming rule (naming series, hash, ...) and
+    field defaults are whatever `frappe.new_doc` filled in. No controller hooks,
+    doc events, child tables or Version rows are run; callers validate in memory
+    beforehand and apply whatever side effects they need afterwards.
+    """
+    if not docs:
+        return []
+
+    doctype = docs[0].doctype
+    timestamp = now()
+    user = frappe.session.user
+    rows = []
+
+    for doc in docs:
+        if doc.doctype != doctype:
+            frappe.throw(f"Cannot bulk insert {doc.doctype} together with {doctype}")
+        if not doc.name:
+            set_new_name(doc)
+        doc.owner = doc.modified_by = user
+        doc.creation = doc.modified = timestamp
+        doc.docstatus = 0
+        rows.append(doc.get_valid_dict(convert_dates_to_str=True, ignore_nulls=False))
+
+    fields = list(rows[0])
+    frappe.db.bulk_insert(
+        doctype,
+        fields,
+        [[row.get(field) for field in fields] for row in rows],
+        chunk_size=chunk_size,
+    )
+    return [doc.name for doc in docs]
+
+
+def bulk_insert_versions(doctype, changes):
+    """
+    Record Version rows for field changes written with raw UPDATEs, so the
+    document timeline still shows them. `changes` maps each document name to a
+    list of (fieldname, old value, new value).
+    """
+    versions = []
+    for name, fields in changes.items():
+        version = frappe.new_doc("Version")
+        version.ref_doctype = doctype
+        version.docname = name
+        version.data = frappe.as_json(
+            {
+                "changed": [list(change) for change in fields],
+                "added": [],
+                "removed": [],
+                "row_changed": [],
+            }
+        )
+        versions.append(version)
+    return bulk_insert_docs(versions)
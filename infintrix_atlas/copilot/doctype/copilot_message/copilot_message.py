@@ -11,9 +11,19 @@ from infintrix_atlas.copilot.llm.dispatcher import run_copilot_llm
 
 
 
+# Deltas are buffered and published in batches so a long answer does not turn
+# into one socket.io emit per token.
+STREAM_FLUSH_CHARS = 80
+
+
 def process_copilot_message(message_name: str):
     """
-    Generates AI response for a user message and publishes realtime.
+    Generates AI response for a user message in a background job.
+
+    The completion is streamed to the session channel as `chunk` events while it
+    is generated; the validated result is persisted and published as a final
+    `response` event. Failures are published as an `error` event so the client
+    can stop waiting.
     """
 
     message = frappe.get_doc("Copilot Message", message_name)
@@ -42,16 +52,40 @@ def process_copilot_message(message_name: str):
         # For other doctypes, just pass the user message
         context = message.content
 
+    # The job runs as the enqueuing user, but publish to the message owner
+    # explicitly so the events always reach the person who asked.
+    user = message.owner
+    buffer = []
 
+    def publish(payload):
+        frappe.publish_realtime(
+            event=session,
+            message={"message": message.name, **payload},
+            user=user,
+        )
 
-
-    
-    result = run_copilot_llm(
-        mode=message.mode,
-        context=context,
-        session=session,
-    )
-    
+    def flush():
+        if buffer:
+            publish({"event": "chunk", "delta": "".join(buffer)})
+            buffer.clear()
+
+    def on_chunk(delta):
+        buffer.append(delta)
+        if sum(len(part) for part in buffer) >= STREAM_FLUSH_CHARS:
+            flush()
+
+    try:
+        result = run_copilot_llm(
+            mode=message.mode,
+            context=context,
+            session=session,
+            on_chunk=on_chunk,
+        )
+        flush()
+    except Exception:
+        frappe.log_error(title="Copilot response failed", reference_doctype="Copilot Message", reference_name=message.name)
+        publish({"event": "error", "error": "Copilot could not generate a response. Please try again."})
+        raise
 
     # Persist assistant message
     ai_message = frappe.new_doc("Copilot Message")
@@ -62,18 +96,14 @@ def process_copilot_message(message_name: str):
     # ai_message.structured = json.dumps(
     #     result.dict()) if hasattr(result, "dict") else None
     ai_message.insert(ignore_permissions=True)
+    frappe.db.commit()
 
     # Publish realtime event
-    frappe.publish_realtime(
-        event=message.session,
-        message={
-            "event": "response",
-            "ai_response": result,
-            "record": ai_message.as_dict(),
-        },
-        user=frappe.session.user,
-        # room=f"copilot_session:{message.session}",
-    )
+    publish({
+        "event": "response",
+        "ai_response": result.model_dump() if hasattr(result, "model_dump") else result,
+        "record": ai_message.as_dict(),
+    })
 
 
 class CopilotMessage(Document):
@@ -98,14 +128,14 @@ class CopilotMessage(Document):
         if self.role != "user":
             return
 
-        # Enqueue background job to generate AI response
-        # frappe.enqueue(
-        #     process_copilot_message,
-        #     message_name=self.name,
-        #     queue="long",
-        # )
-
-        process_copilot_message(self.name)  # For simplicity, call directly (can be async later)
+        # Enqueue background job to generate AI response; the response is
+        # streamed back over realtime, so the insert request returns at once.
+        frappe.enqueue(
+            process_copilot_message,
+            message_name=self.name,
+            queue="long",
+            enqueue_after_commit=True,
+        )
 
     # -------------------------
     # VALIDATION / HELPERS
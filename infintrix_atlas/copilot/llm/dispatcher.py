@@ -1,5 +1,12 @@
 import frappe
 from infintrix_atlas.copilot.llm.openai_client import call_openai
+from infintrix_atlas.copilot.llm.provider import get_llm_settings
+from infintrix_atlas.copilot.llm.response_cache import (
+    CACHEABLE_MODES,
+    get_cached_response,
+    response_cache_key,
+    set_cached_response,
+)
 from infintrix_atlas.copilot.data_models import BreakdownResponse, ImproveResponse, RiskResponse, EffortResponse, GeneralResponse, CreateTasksResponse
 
 
@@ -105,54 +112,44 @@ COPILOT_SYSTEM_PROMPTS = {
     "risk": RISK_SYSTEM_PROMPT,
     "effort": EFFORT_SYSTEM_PROMPT,
 }
-def run_copilot_llm(session: str, mode: str, context: str):
+COPILOT_RESPONSE_MODELS = {
+    "general": GeneralResponse,
+    "create": CreateTasksResponse,
+    "breakdown": BreakdownResponse,
+    "improve": ImproveResponse,
+    "risk": RiskResponse,
+    "effort": EffortResponse,
+}
+
+
+def run_copilot_llm(session: str, mode: str, context: str, on_chunk=None):
     # print(f"Running LLM in mode: {mode} with context: {context}")
-    
-
-    if mode == "general":
-        return call_openai(
-            system_prompt=GENERAL_SYSTEM_PROMPT,
-            user_prompt=context,
-            response_model=GeneralResponse,  # Can be a more generic model if needed
-            session=session,
-        )
-    if mode == "create":
-        return call_openai(
-            system_prompt=CREATE_TASK_SYSTEM_PROMPT,
-            user_prompt=context,
-            response_model=CreateTasksResponse,  # Can be a more generic model if needed
-            session=session,
-        )
-    if mode == "breakdown":
-        return call_openai(
-            system_prompt=BREAKDOWN_SYSTEM_PROMPT,
-            user_prompt=context,
-            response_model=BreakdownResponse,
-            session=session,
-        )
-
-    if mode == "improve":
-        return call_openai(
-            system_prompt=IMPROVE_SYSTEM_PROMPT,
-            user_prompt=context,
-            response_model=ImproveResponse,
-            session=session,
-        )
-
-    if mode == "risk":
-        return call_openai(
-            system_prompt=RISK_SYSTEM_PROMPT,
-            user_prompt=context,
-            response_model=RiskResponse,
-            session=session,
-        )
-
-    if mode == "effort":
-        return call_openai(
-            system_prompt=EFFORT_SYSTEM_PROMPT,
-            user_prompt=context,
-            response_model=EffortResponse,
-            session=session,
-        )
-
-    raise ValueError(f"Unsupported copilot mode: {mode}")
+
+    if mode not in COPILOT_SYSTEM_PROMPTS:
+        raise ValueError(f"Unsupported copilot mode: {mode}")
+
+    system_prompt = COPILOT_SYSTEM_PROMPTS[mode]
+    response_model = COPILOT_RESPONSE_MODELS[mode]
+
+    # Breakdown / improve / risk / effort depend only on the task context, so
+    # rerunning them on an unchanged task is served from the response cache.
+    # General chat and task creation always go to the model.
+    digest = None
+    if mode in CACHEABLE_MODES:
+        digest = response_cache_key(mode, system_prompt, get_llm_settings()["openai_model"], context)
+        cached = get_cached_response(digest, response_model)
+        if cached is not None:
+            return cached
+
+    result = call_openai(
+        system_prompt=system_prompt,
+        user_prompt=context,
+        response_model=response_model,
+        session=session,
+        on_chunk=on_chunk,
+    )
+
+    if digest:
+        set_cached_response(digest, result)
+
+    return result
@@ -1,9 +1,9 @@
 import os
 import json
-from typing import Type
-from openai import OpenAI
+from typing import Callable, Optional, Type
 from pydantic import BaseModel, ValidationError
 import frappe
+from infintrix_atlas.copilot.llm.provider import get_openai_client
 
 
 def get_chat_history(session: str, limit: int = 5):
@@ -44,24 +44,17 @@ def call_openai(
     response_model: Type[BaseModel],
     temperature: float = 0.2,
     session: str = None,  # Pass session for better logging/tracing
+    on_chunk: Optional[Callable[[str], None]] = None,
 ) -> BaseModel:
     """
     Calls OpenAI and validates the response strictly using Pydantic.
-    """
-
-    settings = frappe.get_single("Atlas Settings")
-
-    if settings.llm_provider != "OpenAI":
-        raise RuntimeError("OpenAI provider not enabled")
 
-    api_key = settings.get_password(
-        fieldname="openai_api_key",
-        raise_exception=True
-    )
-
-    model = settings.openai_model or "gpt-4o-2024-08-06"
+    When `on_chunk` is given the completion is streamed and every content
+    delta is passed to it as it arrives; validation still runs once on the
+    full response.
+    """
 
-    client = OpenAI(api_key=api_key)
+    client, model = get_openai_client()
 
     # history = get_chat_history(session) if session else []
 
@@ -80,9 +73,21 @@ def call_openai(
             "type": "json_schema",
             "json_schema": _openai_json_schema(response_model),
         },
+        stream=on_chunk is not None,
     )
 
-    raw_content = response.choices[0].message.content
+    if on_chunk is None:
+        raw_content = response.choices[0].message.content
+    else:
+        parts = []
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                on_chunk(delta)
+        raw_content = "".join(parts)
 
     print(f"Raw LLM response: {raw_content}")
 
@@ -0,0 +1,94 @@
+import threading
+
+import frappe
+from frappe.utils import cint
+import httpx
+from openai import OpenAI
+
+
+DEFAULT_OPENAI_MODEL = "gpt-4o-2024-08-06"
+DEFAULT_DRAFT_CONCURRENCY = 4
+
+# Non-secret Atlas Settings values are cached in Redis for every worker. The
+# decrypted API key and the OpenAI client never leave the process: each worker
+# keeps one client per site and rebuilds it when the cached settings carry a
+# new version token, i.e. after Atlas Settings has been saved.
+SETTINGS_CACHE_KEY = "atlas:llm_settings"
+
+# Pool sizes for the shared HTTP client. Connections are kept alive between
+# calls so repeated requests skip the TCP/TLS handshake.
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY = 60
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_llm_settings():
+    """
+    Return {"version", "llm_provider", "openai_model", "enable_ai_architect",
+    "ai_draft_concurrency"} for the current site, loading Atlas Settings only
+    on a cache miss.
+    """
+    cache = frappe.cache()
+    settings = cache.get_value(SETTINGS_CACHE_KEY)
+    if settings is None:
+        doc = frappe.get_single("Atlas Settings")
+        settings = {
+            "version": frappe.generate_hash(length=10),
+            "llm_provider": doc.llm_provider,
+            "openai_model": doc.openai_model or DEFAULT_OPENAI_MODEL,
+            "enable_ai_architect": doc.enable_ai_architect,
+            "ai_draft_concurrency": cint(doc.ai_draft_concurrency) or DEFAULT_DRAFT_CONCURRENCY,
+        }
+        cache.set_value(SETTINGS_CACHE_KEY, settings)
+    return settings
+
+
+def get_openai_client():
+    """
+    Return `(client, model)` for the current site.
+
+    The client is shared by every caller in this worker process, including
+    threads, and is only rebuilt when Atlas Settings changes.
+    """
+    settings = get_llm_settings()
+    if settings["llm_provider"] != "OpenAI":
+        raise RuntimeError("OpenAI provider not enabled")
+
+    site = frappe.local.site
+    entry = _clients.get(site)
+    if entry is None or entry["version"] != settings["version"]:
+        with _lock:
+            entry = _clients.get(site)
+            if entry is None or entry["version"] != settings["version"]:
+                api_key = frappe.get_single("Atlas Settings").get_password(
+                    fieldname="openai_api_key", raise_exception=True
+                )
+                if entry:
+                    entry["client"].close()
+                entry = {
+                    "version": settings["version"],
+                    "client": _build_openai_client(api_key),
+                }
+                _clients[site] = entry
+
+    return entry["client"], settings["openai_model"]
+
+
+def _build_openai_client(api_key):
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(120.0, connect=10.0),
+    )
+    return OpenAI(api_key=api_key, http_client=http_client)
+
+
+def clear_llm_settings_cache():
+    """Drop cached settings; every worker rebuilds its client on next use."""
+    frappe.cache().delete_value(SETTINGS_CACHE_KEY)
@@ -0,0 +1,90 @@
+import hashlib
+import re
+import time
+
+import frappe
+
+
+# Validated Copilot responses for the deterministic modes, addressed by the
+# content they were generated from. Editing a system prompt, switching the
+# model or changing the task text all produce a new key, so entries never need
+# explicit invalidation; they expire through the TTL or are evicted least
+# recently used first once the cache holds MAX_ENTRIES responses.
+CACHEABLE_MODES = {"breakdown", "improve", "risk", "effort"}
+
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+MAX_ENTRIES = 2000
+
+ENTRY_PREFIX = "atlas:copilot_response:"
+LRU_KEY = "atlas:copilot_response_lru"
+STATS_KEY = "atlas:copilot_response_stats"
+
+
+def _normalise(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def response_cache_key(mode, system_prompt, model, context):
+    prompt_version = hashlib.sha256(system_prompt.encode()).hexdigest()[:12]
+    payload = "\x1f".join([mode, prompt_version, model, _normalise(context)])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_cached_response(digest, response_model):
+    cache = frappe.cache()
+    raw = cache.get_value(ENTRY_PREFIX + digest)
+    if raw is None:
+        cache.zrem(cache.make_key(LRU_KEY), digest)
+        cache.hincrby(cache.make_key(STATS_KEY), "misses", 1)
+        return None
+
+    cache.zadd(cache.make_key(LRU_KEY), {digest: time.time()})
+    cache.hincrby(cache.make_key(STATS_KEY), "hits", 1)
+    return response_model.model_validate_json(raw)
+
+
+def set_cached_response(digest, result):
+    cache = frappe.cache()
+    lru_key = cache.make_key(LRU_KEY)
+
+    cache.set_value(
+        ENTRY_PREFIX + digest,
+        result.model_dump_json(),
+        expires_in_sec=RESPONSE_CACHE_TTL,
+    )
+    cache.zadd(lru_key, {digest: time.time()})
+
+    overflow = cache.zcard(lru_key) - MAX_ENTRIES
+    if overflow > 0:
+        for evicted in cache.zpopmin(lru_key, overflow):
+            member = evicted[0]
+            cache.delete_value(ENTRY_PREFIX + frappe.safe_decode(member))
+        cache.hincrby(cache.make_key(STATS_KEY), "evictions", overflow)
+
+
+def get_response_cache_stats():
+    """
+    Hit/miss/eviction counters and current size, e.g.
+
+        bench --site <site> execute infintrix_atlas.copilot.llm.response_cache.get_response_cache_stats
+    """
+    cache = frappe.cache()
+    # The counters are raw HINCRBY integers; the wrapper's hgetall would prefix
+    # the key again and try to unpickle them.
+    stats = {
+        frappe.safe_decode(k): int(v)
+        for k, v in (cache.execute_command("HGETALL", cache.make_key(STATS_KEY)) or {}).items()
+    }
+    stats.setdefault("hits", 0)
+    stats.setdefault("misses", 0)
+    stats.setdefault("evictions", 0)
+    stats["entries"] = cache.zcard(cache.make_key(LRU_KEY))
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return stats
+
+
+def clear_response_cache():
+    cache = frappe.cache()
+    cache.delete_keys(ENTRY_PREFIX)
+    cache.delete(cache.make_key(LRU_KEY), cache.make_key(STATS_KEY))
@@ -0,0 +1,36 @@
+# Copyright (c) 2026, Muqeet Mughal and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from infintrix_atlas.copilot.data_models import GeneralResponse
+from infintrix_atlas.copilot.llm.response_cache import (
+	clear_response_cache,
+	get_cached_response,
+	get_response_cache_stats,
+	response_cache_key,
+	set_cached_response,
+)
+
+
+class TestResponseCacheStats(FrappeTestCase):
+	def setUp(self):
+		clear_response_cache()
+
+	def tearDown(self):
+		clear_response_cache()
+
+	def test_stats_count_hits_and_misses(self):
+		digest = response_cache_key("improve", "system prompt", "test-model", "Task text")
+
+		self.assertIsNone(get_cached_response(digest, GeneralResponse))
+		set_cached_response(digest, GeneralResponse(message="cached"))
+		self.assertEqual(get_cached_response(digest, GeneralResponse).message, "cached")
+		get_cached_response(digest, GeneralResponse)
+
+		stats = get_response_cache_stats()
+		self.assertEqual(stats["hits"], 2)
+		self.assertEqual(stats["misses"], 1)
+		self.assertEqual(stats["evictions"], 0)
+		self.assertEqual(stats["entries"], 1)
+		self.assertEqual(stats["hit_rate"], 0.667)
@@ -1,28 +1,13 @@
-import frappe
-import requests
-from datetime import datetime
-
-FATHOM_BASE_URL = "https://api.fathom.ai/external/v1"
-
-
-# ================================
-# AUTH + REQUEST
-# ================================
-
-def get_fathom_headers(account):
-    doc = frappe.get_doc("Fathom Account", account)
-    api_key = doc.get_password("api_key")
-    return {"X-Api-Key": api_key}
+import hashlib
+import json
+import zlib
 
+import frappe
+from datetime import datetime, timedelta
 
-def request_fathom(url, headers, params=None):
-    try:
-        res = requests.get(url, headers=headers, params=params, timeout=30)
-        res.raise_for_status()
-        return res.json()
-    except requests.exceptions.RequestException as e:
-        frappe.log_error(frappe.get_traceback(), f"Fathom API Error: {str(e)}")
-        return {}
+from infintrix_atlas.bulk import bulk_insert_docs
+from infintrix_atlas.fathom_integration.client import FathomAPIError, FathomClient, get_metrics
+from infintrix_atlas.fathom_integration.doctype.fathom_meeting.fathom_meeting import compress_transcript
 
 
 # ================================
@@ -33,26 +18,68 @@ def enqueue_sync_all_accounts():
     accounts = frappe.get_all("Fathom Account", fields=["name"])
 
     for acc in accounts:
-        print(f"Enqueuing sync for account: {acc.name}")
-        # sync_account_meetings(acc.name)
-        frappe.enqueue(
-            method="infintrix_atlas.fathom_integration.api.sync_account_meetings",
-            queue="long",
-            timeout=1500,
-            account=acc.name,
-            
-        )
+        enqueue_account_sync(acc.name)
+        # Pick up anything left staged by a worker that exited as a page landed.
+        if frappe.cache().llen(_queue_key(acc.name)):
+            start_meeting_workers(acc.name)
+
+
+def enqueue_account_sync(account, full_resync=False):
+    # One sync per account at a time; an hourly run that finds the previous
+    # one still going is dropped rather than paging the same history twice.
+    frappe.enqueue(
+        method="infintrix_atlas.fathom_integration.api.sync_account_meetings",
+        queue="long",
+        timeout=1500,
+        job_id=f"fathom_sync::{account}",
+        deduplicate=True,
+        account=account,
+        full_resync=full_resync,
+    )
+
+
+@frappe.whitelist()
+def sync_account(account, full_resync=False):
+    """Manual trigger from the Fathom Account form."""
+    frappe.has_permission("Fathom Account", "write", account, throw=True)
+    enqueue_account_sync(account, full_resync=frappe.utils.cint(full_resync))
+    return {"queued": True}
 
 
 # ================================
 # PAGINATED SYNC (STREAMING)
 # ================================
 
-def sync_account_meetings(account):
-    headers = get_fathom_headers(account)
-    url = f"{FATHOM_BASE_URL}/meetings"
-
-    cursor = None
+def sync_account_meetings(account, full_resync=False):
+    """
+    Incremental sync for one account.
+
+    Only recordings created after the account's `created_after` high-water mark
+    are requested. The cursor of the next page is committed after every page,
+    so a run that dies part way resumes from the page it was on (meetings are
+    upserted by recording id, so reprocessing that page is harmless). The
+    high-water mark only moves once the whole run has finished, and a new run
+    starts no later than just before the earliest meeting that failed to
+    process or was staged but never stored, so those are fetched again.
+    `full_resync` ignores all of this and pages the entire history.
+
+    This job only pages the API: each page is staged in Redis and handed to
+    a bounded pool of `process_staged_meetings` jobs.
+    """
+    acc = frappe.db.get_value(
+        "Fathom Account",
+        account,
+        ["created_after", "sync_cursor", "sync_run_created_after", "sync_run_latest"],
+        as_dict=True,
+    )
+    client = FathomClient.for_account(account)
+
+    if full_resync:
+        cursor, run_created_after, run_latest = None, None, None
+    elif acc.sync_cursor:
+        cursor, run_created_after, run_latest = acc.sync_cursor, acc.sync_run_created_after, acc.sync_run_latest
+    else:
+        cursor, run_created_after, run_latest = None, _before_pending_meetings(account, acc.created_after), None
 
     base_params = {
         "limit": 50,
@@ -60,11 +87,8 @@ def sync_account_meetings(account):
         "include_summary": True,
         "include_transcript": True,
     }
-
-    # Incremental sync
-    # last_sync = frappe.db.get_value("Fathom Account", account, "last_sync")
-    # if last_sync:
-    #     base_params["created_after"] = last_sync
+    if run_created_after:
+        base_params["created_after"] = run_created_after
 
     while True:
         params = dict(base_params)
@@ -72,31 +96,247 @@ def sync_account_meetings(account):
         if cursor:
             params["cursor"] = cursor
 
-        data = request_fathom(url, headers, params=params)
+        # Errors propagate: the job fails with the cursor checkpoint intact.
+        data = client.list_meetings(params=params)
         items = data.get("items", [])
 
-        if not items:
-            break
-
+        stage_meetings(account, items)
         for meeting in items:
-            # process_meeting(meeting, account)
-            frappe.enqueue(
-                method="infintrix_atlas.fathom_integration.api.process_meeting",
-                queue="short",
-                timeout=300,
-                meeting=meeting,
-                account=account,
-                is_async=False
-            )
-
-        cursor = data.get("next_cursor")
-        
+            run_latest = _later(run_latest, meeting.get("created_at"))
+
+        cursor = data.get("next_cursor") if items else None
+
         if not cursor:
             break
 
+        # Checkpoint the page we are about to fetch.
+        _save_sync_state(
+            account,
+            sync_cursor=cursor,
+            sync_run_created_after=run_created_after,
+            sync_run_latest=run_latest,
+        )
+
     # Update sync checkpoint AFTER success
-    # frappe.db.set_value("Fathom Account", account,
-    #                     "last_sync", frappe.utils.now())
+    _save_sync_state(
+        account,
+        created_after=_later(run_created_after, run_latest),
+        sync_cursor=None,
+        sync_run_created_after=None,
+        sync_run_latest=None,
+        last_sync=frappe.utils.now(),
+    )
+    frappe.logger("fathom").info({"account": account, "http": get_metrics()})
+
+
+# ================================
+# STAGED PROCESSING (BATCHED WORKERS)
+# ================================
+
+# Meeting payloads (which include the full transcript) are staged in Redis and
+# jobs only carry the account name; workers pop recording ids off a per-account
+# queue in batches. Both knobs can be overridden in site_config.
+DEFAULT_PROCESS_BATCH_SIZE = 25
+DEFAULT_PROCESS_WORKERS = 4
+STAGED_MEETING_TTL = 24 * 60 * 60
+# Redis only carries the payloads and may drop them; Fathom Pending Meeting is
+# the durable record of what is still to be stored. Rows are removed in the
+# transaction that stores the meeting. The next sync starts before any row that
+# failed or has sat untouched for STALE_PENDING_AFTER seconds, and a meeting is
+# given up after MAX_MEETING_ATTEMPTS failures.
+MAX_MEETING_ATTEMPTS = 3
+STALE_PENDING_AFTER = 60 * 60
+PENDING_TABLE = "tabFathom Pending Meeting"
+
+
+def _queue_key(account):
+    return f"fathom:queue:{account}"
+
+
+def _staged_key(account, recording_id):
+    return f"fathom:staged:{account}:{recording_id}"
+
+
+def _pending_name(account, recording_id):
+    return f"{account}::{recording_id}"
+
+
+def _add_pending(account, meetings):
+    # Re-staging a meeting keeps its attempt count but makes it fresh again.
+    timestamp = frappe.utils.now()
+    user = frappe.session.user
+    placeholders = []
+    params = []
+    for meeting in meetings:
+        recording_id = str(meeting["recording_id"])
+        placeholders.append("(%s, %s, %s, %s, %s, 0, 0, %s, %s, %s, 0)")
+        params.extend([
+            _pending_name(account, recording_id), timestamp, timestamp, user, user,
+            account, recording_id, meeting.get("created_at"),
+        ])
+
+    frappe.db.sql(
+        f"""
+        INSERT INTO `{PENDING_TABLE}`
+            (name, creation, modified, owner, modified_by, docstatus, idx,
+            account, recording_id, created_at, attempts)
+        VALUES {", ".join(placeholders)}
+        ON DUPLICATE KEY UPDATE
+            created_at = VALUES(created_at), modified = VALUES(modified)
+        """,
+        params,
+    )
+
+
+def _settle_pending(account, stored, failed):
+    """Drop the rows of stored meetings and count a failed attempt for the rest."""
+    if stored:
+        frappe.db.delete(
+            "Fathom Pending Meeting",
+            {"name": ("in", [_pending_name(account, rid) for rid in stored])},
+        )
+    if not failed:
+        return
+
+    names = [_pending_name(account, rid) for rid in failed]
+    frappe.db.sql(
+        f"UPDATE `{PENDING_TABLE}` SET attempts = attempts + 1, modified = %s WHERE name IN %s",
+        (frappe.utils.now(), tuple(names)),
+    )
+    exhausted = frappe.get_all(
+        "Fathom Pending Meeting",
+        filters={"name": ["in", names], "attempts": [">=", MAX_MEETING_ATTEMPTS]},
+        fields=["name", "recording_id", "attempts"],
+    )
+    for row in exhausted:
+        frappe.log_error(
+            f"Giving up on recording {row.recording_id} of {account} after {row.attempts} attempts",
+            "Fathom Meeting Sync Failed",
+        )
+    if exhausted:
+        frappe.db.delete("Fathom Pending Meeting", {"name": ("in", [row.name for row in exhausted])})
+
+
+def stage_meetings(account, meetings):
+    cache = frappe.cache()
+    meetings = [meeting for meeting in meetings if meeting.get("recording_id")]
+    if not meetings:
+        return
+
+    _add_pending(account, meetings)
+    # Workers settle these rows, so they must be committed before any job runs.
+    frappe.db.commit()
+
+    for meeting in meetings:
+        recording_id = str(meeting["recording_id"])
+        cache.set_value(
+            _staged_key(account, recording_id),
+            zlib.compress(json.dumps(meeting).encode()),
+            expires_in_sec=STAGED_MEETING_TTL,
+        )
+        cache.rpush(_queue_key(account), recording_id)
+
+    start_meeting_workers(account)
+
+
+def start_meeting_workers(account):
+    # Fixed job ids cap the pool: a worker that is already queued or running
+    # keeps draining the queue, so enqueueing again is a no-op.
+    workers = frappe.utils.cint(frappe.conf.get("fathom_sync_workers")) or DEFAULT_PROCESS_WORKERS
+    for slot in range(workers):
+        frappe.enqueue(
+            method="infintrix_atlas.fathom_integration.api.process_staged_meetings",
+            queue="long",
+            timeout=1500,
+            job_id=f"fathom_process::{account}::{slot}",
+            deduplicate=True,
+            account=account,
+        )
+
+
+def process_staged_meetings(account):
+    """Drain the account's staged queue in batches until it is empty."""
+    cache = frappe.cache()
+    batch_size = frappe.utils.cint(frappe.conf.get("fathom_sync_batch_size")) or DEFAULT_PROCESS_BATCH_SIZE
+    client = FathomClient.for_account(account)
+
+    while True:
+        batch = []
+        for _ in range(batch_size):
+            recording_id = cache.lpop(_queue_key(account))
+            if recording_id is None:
+                break
+            batch.append(frappe.safe_decode(recording_id))
+        if not batch:
+            break
+
+        stored, failed = [], []
+        committed = False
+        try:
+            for recording_id in batch:
+                raw = cache.get_value(_staged_key(account, recording_id))
+                if raw is None:
+                    # Expired or evicted: a failed attempt, so the sync fetches it again.
+                    failed.append(recording_id)
+                elif process_meeting(json.loads(zlib.decompress(raw)), account, client=client):
+                    stored.append(recording_id)
+                else:
+                    failed.append(recording_id)
+            _settle_pending(account, stored, failed)
+            frappe.db.commit()
+            committed = True
+        finally:
+            if committed:
+                # Failed payloads go too: the next sync fetches them fresh.
+                for recording_id in batch:
+                    cache.delete_value(_staged_key(account, recording_id))
+            else:
+                # Killed mid-batch (e.g. job timeout): nothing was committed,
+                # so hand the whole batch back with its payloads.
+                for recording_id in batch:
+                    cache.rpush(_queue_key(account), recording_id)
+
+
+def _save_sync_state(account, **values):
+    frappe.db.set_value("Fathom Account", account, values, update_modified=False)
+    frappe.db.commit()
+
+
+def _before_pending_meetings(account, created_after):
+    """`created_after`, moved back to just before the earliest failed or stale pending meeting."""
+    stale_before = frappe.utils.add_to_date(frappe.utils.now_datetime(), seconds=-STALE_PENDING_AFTER)
+    earliest = None
+    for (created_at,) in frappe.db.sql(
+        f"""
+        SELECT created_at FROM `{PENDING_TABLE}`
+        WHERE account = %s AND created_at IS NOT NULL
+            AND (attempts > 0 OR modified < %s)
+        """,
+        (account, stale_before),
+    ):
+        if not earliest or _parse_iso(created_at) < _parse_iso(earliest):
+            earliest = created_at
+    if not earliest:
+        return created_after
+
+    floor = (_parse_iso(earliest) - timedelta(seconds=1)).isoformat().replace("+00:00", "Z")
+    if created_after and _parse_iso(created_after) <= _parse_iso(floor):
+        return created_after
+    return floor
+
+
+def _later(a, b):
+    """The later of two Fathom ISO timestamps, keeping the original string."""
+    if not a or not b:
+        return a or b
+    return a if _parse_iso(a) >= _parse_iso(b) else b
+
+
+def _parse_iso(value):
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
 
 def normalize_summary(summary):
     if summary is None:
@@ -106,20 +346,23 @@ def normalize_summary(summary):
     return summary
 
 
-def get_meeting_summary(recording_id, account="Muqeet"):
-    headers = get_fathom_headers(account)
-    url = f"{FATHOM_BASE_URL}/recordings/{recording_id}/summary"
-    data = request_fathom(url, headers)
-    summary = data.get("summary")
-    if isinstance(summary, dict):
-        return summary.get("markdown_formatted") or summary.get("text") or summary.get("summary")
-    return summary
+def get_meeting_summary(recording_id, account, client=None):
+    client = client or FathomClient.for_account(account)
+    try:
+        data = client.get_summary(recording_id)
+    except FathomAPIError:
+        frappe.log_error(frappe.get_traceback(), "Fathom API Error")
+        return None
+    return normalize_summary(data.get("summary"))
 
 
-def get_meeting_transcript(recording_id, account):
-    headers = get_fathom_headers(account)
-    url = f"{FATHOM_BASE_URL}/recordings/{recording_id}/transcript"
-    data = request_fathom(url, headers)
+def get_meeting_transcript(recording_id, account, client=None):
+    client = client or FathomClient.for_account(account)
+    try:
+        data = client.get_transcript(recording_id)
+    except FathomAPIError:
+        frappe.log_error(frappe.get_traceback(), "Fathom API Error")
+        return []
     return data.get("transcript") or []
 
 
@@ -136,74 +379,130 @@ def _transcript_payload(row, recording_id):
 # MEETING PROCESSOR (WORKER UNIT)
 # ================================
 
-def process_meeting(meeting, account):
+# Transcripts with at least this many utterances are stored compressed in
+# `transcript_blob` instead of as child rows. 0 disables blob storage.
+TRANSCRIPT_BLOB_MIN_ROWS = 1000
+
+MEETING_FIELDS = (
+    "meeting_title",
+    "meeting_url",
+    "share_url",
+    "scheduled_start_time",
+    "scheduled_end_time",
+    "recording_start_date",
+    "recording_end_date",
+    "recorded_by",
+    "data",
+    "summary",
+    "transcript_blob",
+)
+
+
+def process_meeting(meeting, account, client=None):
+    """
+    Upsert one meeting from the list API. Returns False if it failed, in
+    which case nothing of it was written.
+
+    Meetings whose payload hash matches the stored `content_hash` are skipped.
+    Otherwise the parent row is written without loading the existing document
+    (which would pull in every transcript row) and the transcript is replaced
+    with a single DELETE and a multi-row INSERT, or stored as a compressed blob
+    for very long meetings. `content_hash` is written last, so a meeting is
+    only skipped once it was stored completely.
+    """
+    recording_id = meeting.get("recording_id")
+    if not recording_id:
+        return True
+
+    frappe.db.savepoint("fathom_meeting")
     try:
-        recording_id = meeting.get("recording_id")
-        if not recording_id:
-            return
+        content_hash = _content_hash(meeting)
 
-        existing = frappe.db.exists(
+        existing = frappe.db.get_value(
             "Fathom Meeting",
-            {"recording_id": str(recording_id), "account": account}
+            {"recording_id": str(recording_id), "account": account},
+            ["name", "content_hash"],
+            as_dict=True,
         )
+        if existing and existing.content_hash == content_hash:
+            return True
 
-        if existing:
-            doc = frappe.get_doc("Fathom Meeting", existing)
+        if "summary" in meeting or "default_summary" in meeting:
+            summary = normalize_summary(meeting.get("summary") or meeting.get("default_summary"))
         else:
-            doc = frappe.new_doc("Fathom Meeting")
-
-        # Core fields
-        doc.account = account
-        doc.recording_id = str(recording_id)
-        doc.meeting_title = meeting.get(
-            "meeting_title") or meeting.get("title")
-
-        doc.meeting_url = meeting.get("url")
-        doc.share_url = meeting.get("share_url")
-
-        doc.scheduled_start_time = normalize_datetime(
-            meeting.get("scheduled_start_time"))
-        doc.scheduled_end_time = normalize_datetime(
-            meeting.get("scheduled_end_time"))
-
-        doc.recording_start_date = to_date(meeting.get("recording_start_time"))
-        doc.recording_end_date = to_date(meeting.get("recording_end_time"))
-
-        doc.recorded_by = normalize_person(meeting.get("recorded_by"))
-        doc.data = frappe.as_json(meeting)
-        
-        
-        doc.summary = normalize_summary(
-            meeting.get("summary") or meeting.get("default_summary")
-        )
+            summary = get_meeting_summary(recording_id, account, client=client)
 
-        if not doc.summary:
-            doc.summary = get_meeting_summary(recording_id, account=account)
-
-        # Only insert invitees ONCE (avoid heavy rewrites)
-        if not existing:
-            for invitee in meeting.get("calendar_invitees", []) or []:
-                doc.append("invitees", _invitee_payload(invitee))
-                
         transcript_rows = meeting.get("transcript")
         if transcript_rows is None:
-            transcript_rows = get_meeting_transcript(recording_id, account=account)
-            
-            
-        doc.set("transcript", [])
-        for row in transcript_rows or []:
-            doc.append("transcript", _transcript_payload(row, recording_id))
-                
-
-        doc.flags.ignore_permissions = True
+            transcript_rows = get_meeting_transcript(recording_id, account, client=client)
+        transcript = [_transcript_payload(row, recording_id) for row in transcript_rows or []]
+
+        use_blob = TRANSCRIPT_BLOB_MIN_ROWS and len(transcript) >= TRANSCRIPT_BLOB_MIN_ROWS
+
+        values = {
+            "meeting_title": meeting.get("meeting_title") or meeting.get("title"),
+            "meeting_url": meeting.get("url"),
+            "share_url": meeting.get("share_url"),
+            "scheduled_start_time": normalize_datetime(meeting.get("scheduled_start_time")),
+            "scheduled_end_time": normalize_datetime(meeting.get("scheduled_end_time")),
+            "recording_start_date": to_date(meeting.get("recording_start_time")),
+            "recording_end_date": to_date(meeting.get("recording_end_time")),
+            "recorded_by": normalize_person(meeting.get("recorded_by")),
+            "data": frappe.as_json(meeting),
+            "summary": summary,
+            "transcript_blob": compress_transcript(transcript) if use_blob else None,
+        }
 
         if existing:
-            doc.save(ignore_permissions=True)
+            name = existing.name
+            frappe.db.set_value("Fathom Meeting", name, {f: values[f] for f in MEETING_FIELDS})
         else:
+            doc = frappe.new_doc("Fathom Meeting")
+            doc.update(values)
+            doc.account = account
+            doc.recording_id = str(recording_id)
+
+            # Only insert invitees ONCE (avoid heavy rewrites)
+            for invitee in meeting.get("calendar_invitees", []) or []:
+                doc.append("invitees", _invitee_payload(invitee))
+
             doc.insert(ignore_permissions=True)
+            name = doc.name
+
+        _replace_transcript(name, [] if use_blob else transcript)
+        frappe.db.set_value("Fathom Meeting", name, "content_hash", content_hash, update_modified=False)
 
     except Exception:
+        frappe.db.rollback(save_point="fathom_meeting")
         frappe.log_error(frappe.get_traceback(), "Fathom Meeting Sync Failed")
+        return False
+
+    return True
+
+
+def _content_hash(meeting):
+    return hashlib.sha256(
+        json.dumps(meeting, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _replace_transcript(meeting_name, transcript):
+    frappe.db.delete(
+        "Fathom Meeting Transcript",
+        {"parent": meeting_name, "parenttype": "Fathom Meeting", "parentfield": "transcript"},
+    )
+
+    rows = []
+    for idx, payload in enumerate(transcript, start=1):
+        row = frappe.new_doc("Fathom Meeting Transcript")
+        row.update(payload)
+        row.parent = meeting_name
+        row.parenttype = "Fathom Meeting"
+        row.parentfield = "transcript"
+        row.idx = idx
+        rows.append(row)
+
+    bulk_insert_docs(rows, chunk_size=500)
 
 
 # ================================
@@ -0,0 +1,241 @@
+import hashlib
+import random
+import threading
+import time
+
+import frappe
+import requests
+from requests.adapters import HTTPAdapter
+
+FATHOM_BASE_URL = "https://api.fathom.ai/external/v1"
+
+# Fathom allows 60 requests per minute per API key. The sync job and every
+# staged-processing worker share one bucket per key, kept in Redis.
+DEFAULT_RATE_PER_SEC = 1.0
+DEFAULT_BURST = 10
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FathomAPIError(Exception):
+    def __init__(self, message, status_code=None, url=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.url = url
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, at most `capacity` banked."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+
+# Refills and takes one token atomically using the Redis clock, so workers on
+# different hosts agree. Returns how long to wait before trying again (0 when a
+# token was taken), as a string because Lua numbers reply as integers.
+TAKE_TOKEN_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    """TokenBucket shared through Redis by every process that uses the same `key`."""
+
+    def __init__(self, key, rate, capacity, sleep=time.sleep):
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+        self.sleep = sleep
+
+    def acquire(self):
+        cache = frappe.cache()
+        while True:
+            wait = float(cache.eval(TAKE_TOKEN_SCRIPT, 1, cache.make_key(self.key), self.rate, self.capacity))
+            if wait <= 0:
+                return
+            self.sleep(wait)
+
+
+class FathomMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.statuses = {}
+
+    def record(self, status, latency_ms):
+        self.requests += 1
+        self.total_latency_ms += latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "mean_latency_ms": round(self.total_latency_ms / self.requests, 1) if self.requests else 0.0,
+            "max_latency_ms": round(self.max_latency_ms, 1),
+            "statuses": dict(self.statuses),
+        }
+
+
+# Shared by every client in this worker process: one connection pool and one
+# set of counters. Rate limiting is shared across processes through Redis.
+_session = None
+_metrics = FathomMetrics()
+_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                # Retries are handled by FathomClient so they go through the rate limiter.
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _bucket_for(api_key, rate, burst):
+    # Keyed by a digest so the API key itself never lands in Redis.
+    digest = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+    return RedisTokenBucket(f"fathom:rate:{digest}", rate, burst)
+
+
+def get_metrics():
+    """Request counters for this worker process."""
+    return _metrics.as_dict()
+
+
+class FathomClient:
+    """
+    Thin Fathom API client.
+
+    Everything it depends on can be injected (`base_url`, `session`, `bucket`,
+    `sleep`), so it can be pointed at a local stub server in tests. Errors are
+    raised as `FathomAPIError` after bounded retries with jittered exponential
+    backoff on 429 / 5xx / connection failures.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        base_url=None,
+        session=None,
+        bucket=None,
+        metrics=None,
+        max_retries=4,
+        backoff=1.0,
+        max_backoff=30.0,
+        timeout=30,
+        sleep=time.sleep,
+    ):
+        self.api_key = api_key
+        self.base_url = (base_url or FATHOM_BASE_URL).rstrip("/")
+        self.session = session or get_session()
+        self.bucket = bucket or _bucket_for(api_key, DEFAULT_RATE_PER_SEC, DEFAULT_BURST)
+        self.metrics = metrics or _metrics
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.sleep = sleep
+
+    @classmethod
+    def for_account(cls, account, **kwargs):
+        doc = frappe.get_doc("Fathom Account", account)
+        kwargs.setdefault("base_url", frappe.conf.get("fathom_base_url"))
+        return cls(doc.get_password("api_key"), **kwargs)
+
+    def get(self, path, params=None):
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        headers = {"X-Api-Key": self.api_key}
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            started = time.perf_counter()
+            try:
+                res = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.metrics.record("error", (time.perf_counter() - started) * 1000)
+                if attempt < self.max_retries:
+                    self._wait(attempt)
+                    continue
+                self.metrics.failures += 1
+                raise FathomAPIError(f"Fathom request failed: {e}", url=url) from e
+
+            self.metrics.record(res.status_code, (time.perf_counter() - started) * 1000)
+
+            if res.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._wait(attempt, res.headers.get("Retry-After"))
+                continue
+
+            if not res.ok:
+                self.metrics.failures += 1
+                raise FathomAPIError(
+                    f"Fathom API returned {res.status_code}: {res.text[:500]}",
+                    status_code=res.status_code,
+                    url=url,
+                )
+
+            return res.json()
+
+    def _wait(self, attempt, retry_after=None):
+        self.metrics.retries += 1
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            # Full jitter: anywhere up to the exponential ceiling.
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        self.sleep(delay)
+
+    def list_meetings(self, params=None):
+        return self.get("meetings", params=params)
+
+    def get_summary(self, recording_id):
+        return self.get(f"recordings/{recording_id}/summary")
+
+    def get_transcript(self, recording_id):
+        return self.get(f"recordings/{recording_id}/transcript")
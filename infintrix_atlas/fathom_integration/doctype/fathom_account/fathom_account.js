@@ -1,8 +1,28 @@
 // Copyright (c) 2026, Muqeet Mughal and contributors
 // For license information, please see license.txt
 
-// frappe.ui.form.on("Fathom Account", {
-// 	refresh(frm) {
+frappe.ui.form.on("Fathom Account", {
+	refresh(frm) {
+		if (frm.is_new()) return;
 
-// 	},
-// });
+		frm.add_custom_button(__("Sync Now"), () => sync(frm, false), __("Sync"));
+		frm.add_custom_button(
+			__("Full Resync"),
+			() =>
+				frappe.confirm(
+					__("Re-download every meeting and transcript for this account?"),
+					() => sync(frm, true)
+				),
+			__("Sync")
+		);
+	},
+});
+
+function sync(frm, full_resync) {
+	frappe
+		.call("infintrix_atlas.fathom_integration.api.sync_account", {
+			account: frm.doc.name,
+			full_resync: full_resync ? 1 : 0,
+		})
+		.then(() => frappe.show_alert({ message: __("Sync queued"), indicator: "green" }));
+}
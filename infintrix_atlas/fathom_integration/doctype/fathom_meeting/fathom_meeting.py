@@ -1,9 +1,33 @@
 # Copyright (c) 2026, Muqeet Mughal and contributors
 # For license information, please see license.txt
 
-# import frappe
+import base64
+import json
+import zlib
+
 from frappe.model.document import Document
 
 
+def compress_transcript(rows):
+	return base64.b64encode(zlib.compress(json.dumps(rows).encode(), 6)).decode()
+
+
+def decompress_transcript(blob):
+	return json.loads(zlib.decompress(base64.b64decode(blob)))
+
+
 class FathomMeeting(Document):
-	pass
+	def get_transcript_rows(self):
+		"""Transcript as a list of dicts, whichever way it is stored."""
+		if self.transcript_blob:
+			return decompress_transcript(self.transcript_blob)
+		return [
+			{
+				"recording_id": row.recording_id,
+				"speaker_name": row.speaker_name,
+				"speaker_calender_email": row.speaker_calender_email,
+				"timestamp": row.timestamp,
+				"text": row.text,
+			}
+			for row in self.transcript
+		]
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Muqeet Mughal and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Fathom Pending Meeting", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,119 @@
+# Copyright (c) 2026, Muqeet Mughal and Contributors
+# See license.txt
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import frappe
+import requests
+from frappe.tests.utils import FrappeTestCase
+
+from infintrix_atlas.fathom_integration.client import (
+	FathomAPIError,
+	FathomClient,
+	FathomMetrics,
+	RedisTokenBucket,
+	TokenBucket,
+)
+
+
+class StubFathomHandler(BaseHTTPRequestHandler):
+	"""Answers from `server.responses`, a list of (status, body) popped per request."""
+
+	def do_GET(self):
+		self.server.requests.append((self.path, self.headers.get("X-Api-Key")))
+		status, body = self.server.responses.pop(0) if self.server.responses else (200, {})
+		payload = json.dumps(body).encode()
+		self.send_response(status)
+		if status == 429:
+			self.send_header("Retry-After", "0")
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(payload)))
+		self.end_headers()
+		self.wfile.write(payload)
+
+	def log_message(self, *args):
+		pass
+
+
+class TestFathomClient(FrappeTestCase):
+	def setUp(self):
+		self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubFathomHandler)
+		self.server.responses = []
+		self.server.requests = []
+		threading.Thread(target=self.server.serve_forever, daemon=True).start()
+		self.sleeps = []
+		self.metrics = FathomMetrics()
+
+	def tearDown(self):
+		self.server.shutdown()
+		self.server.server_close()
+
+	def client(self, **kwargs):
+		return FathomClient(
+			"test-key",
+			base_url=f"http://127.0.0.1:{self.server.server_address[1]}",
+			session=requests.Session(),
+			bucket=TokenBucket(1000, 1000),
+			metrics=self.metrics,
+			sleep=self.sleeps.append,
+			**kwargs,
+		)
+
+	def test_retries_rate_limited_and_server_errors(self):
+		self.server.responses = [(429, {}), (503, {}), (200, {"items": [{"recording_id": 1}]})]
+
+		data = self.client().list_meetings(params={"limit": 50})
+
+		self.assertEqual(data, {"items": [{"recording_id": 1}]})
+		self.assertEqual(len(self.server.requests), 3)
+		self.assertTrue(self.server.requests[0][0].startswith("/meetings?limit=50"))
+		self.assertEqual(self.server.requests[0][1], "test-key")
+		self.assertEqual(self.sleeps[0], 0.0)
+		metrics = self.metrics.as_dict()
+		self.assertEqual(metrics["requests"], 3)
+		self.assertEqual(metrics["retries"], 2)
+		self.assertEqual(metrics["statuses"], {429: 1, 503: 1, 200: 1})
+
+	def test_raises_after_bounded_retries(self):
+		self.server.responses = [(500, {})] * 3
+
+		with self.assertRaises(FathomAPIError) as error:
+			self.client(max_retries=2).get_summary("42")
+
+		self.assertEqual(error.exception.status_code, 500)
+		self.assertEqual(len(self.server.requests), 3)
+		self.assertEqual(self.metrics.failures, 1)
+
+	def test_client_error_is_not_retried(self):
+		self.server.responses = [(404, {"error": "not found"})]
+
+		with self.assertRaises(FathomAPIError) as error:
+			self.client().get_transcript("42")
+
+		self.assertEqual(error.exception.status_code, 404)
+		self.assertEqual(len(self.server.requests), 1)
+
+
+class TestRedisTokenBucket(FrappeTestCase):
+	def test_waits_once_the_burst_is_spent(self):
+		key = "fathom:rate:test"
+		frappe.cache().delete(frappe.cache().make_key(key))
+		waits = []
+
+		def sleep(seconds):
+			waits.append(seconds)
+			time.sleep(seconds)
+
+		bucket = RedisTokenBucket(key, rate=10, capacity=2, sleep=sleep)
+
+		bucket.acquire()
+		bucket.acquire()
+		self.assertEqual(waits, [])
+
+		# Another process sharing the key sees the same empty bucket.
+		RedisTokenBucket(key, rate=10, capacity=2, sleep=sleep).acquire()
+		self.assertTrue(waits)
+		self.assertTrue(all(0 < wait <= 0.1 for wait in waits))
@@ -157,6 +157,93 @@ doc_events = {
         "after_insert": "infintrix_atlas.events.project.after_insert",
         "before_insert": "infintrix_atlas.events.project.before_insert",
         "validate": "infintrix_atlas.events.project.validate",
+        "on_update": [
+            "infintrix_atlas.board_cache.invalidate_board_cache",
+            "infintrix_atlas.permissions.clear_project_access_cache",
+            "infintrix_atlas.search_index.update_search_index",
+            "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        ],
+        "on_trash": [
+            "infintrix_atlas.permissions.clear_project_access_cache",
+            "infintrix_atlas.search_index.remove_from_search_index",
+        ],
+    },
+    "Project User": {
+        "after_insert": "infintrix_atlas.permissions.clear_project_access_cache",
+        "on_trash": "infintrix_atlas.permissions.clear_project_access_cache",
+    },
+    "Customer": {
+        "on_update": "infintrix_atlas.permissions.clear_project_access_cache",
+    },
+    "Portal User": {
+        "after_insert": "infintrix_atlas.permissions.clear_project_access_cache",
+        "on_trash": "infintrix_atlas.permissions.clear_project_access_cache",
+    },
+    "Task": {
+        "before_insert": "infintrix_atlas.ranking.set_initial_rank",
+        "on_update": [
+            "infintrix_atlas.board_cache.invalidate_board_cache",
+            "infintrix_atlas.search_index.update_search_index",
+            "infintrix_atlas.progress_counters.update_progress_counters",
+            "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        ],
+        "on_trash": [
+            "infintrix_atlas.board_cache.invalidate_board_cache",
+            "infintrix_atlas.search_index.remove_from_search_index",
+            "infintrix_atlas.progress_counters.remove_progress_counters",
+            "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        ],
+    },
+    "ToDo": {
+        "on_update": "infintrix_atlas.board_cache.invalidate_board_cache",
+        "on_trash": "infintrix_atlas.board_cache.invalidate_board_cache",
+    },
+    "Cycle": {
+        "on_update": [
+            "infintrix_atlas.board_cache.invalidate_board_cache",
+            "infintrix_atlas.search_index.update_search_index",
+        ],
+        "on_trash": [
+            "infintrix_atlas.board_cache.invalidate_board_cache",
+            "infintrix_atlas.search_index.remove_from_search_index",
+        ],
+    },
+    "Project Phase": {
+        "on_update": [
+            "infintrix_atlas.board_cache.invalidate_board_cache",
+            "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        ],
+        "on_trash": [
+            "infintrix_atlas.board_cache.invalidate_board_cache",
+            "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        ],
+    },
+    "Requirement": {
+        "on_update": [
+            "infintrix_atlas.search_index.update_search_index",
+            "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        ],
+        "on_trash": [
+            "infintrix_atlas.search_index.remove_from_search_index",
+            "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        ],
+    },
+    "Project Action Request": {
+        "on_update": "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        "on_trash": "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+    },
+    "Project Resource": {
+        "on_update": "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        "on_trash": "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+    },
+    "Sales Invoice": {
+        "on_submit": "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        "on_cancel": "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+        "on_update_after_submit": "infintrix_atlas.portal_snapshot.mark_portal_snapshot_stale",
+    },
+    "Change Request": {
+        "on_update": "infintrix_atlas.search_index.update_search_index",
+        "on_trash": "infintrix_atlas.search_index.remove_from_search_index",
     },
 }
 
@@ -183,8 +270,11 @@ doc_events = {
 
 scheduler_events = {
     "hourly": [
-        "infintrix_atlas.fathom_integration.api.sync_accounts",
-    ]
+        "infintrix_atlas.fathom_integration.api.enqueue_sync_all_accounts",
+    ],
+    "daily": [
+        "infintrix_atlas.progress_counters.reconcile_progress_counters",
+    ],
 }
 
 # Testing
@@ -5,11 +5,19 @@ import frappe
 from frappe.model.document import Document
 
 
+DRAFT_STATUSES = {"Draft", "Approved", "Rejected", "Created", "Failed"}
+
+
+def validate_draft(draft):
+    """Shared by the controller and the pipeline's bulk insert path."""
+    if not draft.get("project"):
+        frappe.throw("Project is required.")
+    if not draft.get("subject"):
+        frappe.throw("Subject is required.")
+    if draft.get("status") and draft.get("status") not in DRAFT_STATUSES:
+        frappe.throw("Invalid AI Task Draft status.")
+
+
 class AITaskDraft(Document):
     def validate(self):
-        if not self.project:
-            frappe.throw("Project is required.")
-        if not self.subject:
-            frappe.throw("Subject is required.")
-        if self.status and self.status not in {"Draft", "Validated", "Rejected", "Created"}:
-            frappe.throw("Invalid AI Task Draft status.")
+        validate_draft(self)
@@ -3,6 +3,7 @@
 
 import frappe
 from frappe.model.document import Document
+from infintrix_atlas.copilot.llm.provider import clear_llm_settings_cache
 
 
 class AtlasSettings(Document):
@@ -11,3 +12,6 @@ class AtlasSettings(Document):
             frappe.throw("OpenAI API Key is required when provider is OpenAI.")
         if self.llm_provider == "Gemini" and not self.gemini_api_key:
             frappe.throw("Gemini API Key is required when provider is Gemini.")
+
+    def on_update(self):
+        clear_llm_settings_cache()
@@ -3,6 +3,7 @@
 
 import frappe
 from frappe.model.document import Document
+from infintrix_atlas.progress_counters import keep_stored_counters
 
 
 class Cycle(Document):
@@ -51,6 +52,9 @@ class Cycle(Document):
 			if active_cycle and self.status == "Active" and project.custom_execution_mode == "Scrum":
 				frappe.throw(f"Phase already has an active cycle: {active_cycle}")
 
+	def before_save(self):
+		keep_stored_counters(self)
+
 	def on_update(self):
 		if self.status == "Completed" and not self.actual_end_date:
 			self.actual_end_date = frappe.utils.now()
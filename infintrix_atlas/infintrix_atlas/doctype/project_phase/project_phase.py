@@ -4,6 +4,7 @@
 # import frappe
 from frappe.model.document import Document
 import frappe
+from infintrix_atlas.progress_counters import keep_stored_counters
 
 
 class ProjectPhase(Document):
@@ -97,10 +98,9 @@ class ProjectPhase(Document):
         if self.status != "Completed":
             return
 
-        open_tasks = frappe.db.count(
-            "Task",
-            {"custom_phase": self.name, "status": ["!=", "Completed"]}
-        )
+        # Read the stored counter rather than this doc's copy, which may be stale.
+        open_tasks = frappe.db.get_value(
+            "Project Phase", self.name, "open_tasks") or 0
 
         if open_tasks > 0:
             frappe.throw("Cannot complete phase with open tasks.")
@@ -154,3 +154,4 @@ class ProjectPhase(Document):
     def before_save(self):
         """Set default dates based on status"""
         self.set_defaults()
+        keep_stored_counters(self)
@@ -1,8 +1,23 @@
 import frappe
 from frappe import _
+from infintrix_atlas.board_cache import clear_all_board_caches
+from infintrix_atlas.copilot.llm.provider import clear_llm_settings_cache
+from infintrix_atlas.progress_counters import reconcile_progress_counters, refresh_progress_counters
+from infintrix_atlas.ranking import backfill_ranks
+from infintrix_atlas.search_index import ensure_search_index
 
 
 def after_install():
+    # Keyset pagination in list_tasks walks (project, modified, name).
+    frappe.db.add_index("Task", ["project", "modified", "name"])
+    # Board order: MAX(custom_rank) per project for new tasks.
+    frappe.db.add_index("Task", ["project", "custom_rank"])
+    backfill_ranks()
+    ensure_search_index()
+    reconcile_progress_counters()
+    # The cached settings dict has no TTL; rebuild it in the current shape.
+    clear_llm_settings_cache()
+
     Task = frappe.qb.DocType("Task")
 
     # Find affected projects /tasks without custom_phase
@@ -47,6 +62,8 @@ def after_install():
             """,
             {"phase": phase_name, "project": project},
         )
+        refresh_progress_counters(phases=[phase_name])
 
     frappe.db.commit()
+    clear_all_board_caches()
 
@@ -4,6 +4,7 @@ from erpnext.projects.doctype.project.project import Project
 from frappe.utils import add_days, flt, get_datetime, get_link_to_form, get_time, get_url, nowtime, today
 from frappe import _
 from hrms.overrides.employee_project import EmployeeProject
+from infintrix_atlas.user_display import get_full_names
 print("ATLAS PROJECT CONTROLLER LOADED")
 class AtlasProject(EmployeeProject):
 	def validate(self):
@@ -48,6 +49,8 @@ class AtlasProject(EmployeeProject):
 
 		# Replace the selection with:
 
+		full_names = get_full_names([self.owner] + [u.user for u in self.users if u.welcome_email_sent == 0])
+
 		for user in self.users:
 			if user.welcome_email_sent == 0:
 				content = """
@@ -72,10 +75,10 @@ class AtlasProject(EmployeeProject):
 				<p>—<br>
 				{company_name}</p>
 				""".format(
-					user_name=frappe.db.get_value("User", user.user, "full_name") or user.user,
+					user_name=full_names.get(user.user) or user.user,
 					project_name=self.project_name,
 					role="Member",
-					added_by=frappe.db.get_value("User", self.owner, "full_name") or self.owner,
+					added_by=full_names.get(self.owner) or self.owner,
 					start_date=self.expected_start_date or "Not specified",
 					project_link=url,
 					company_name=self.company or frappe.defaults.get_user_default("Company"),
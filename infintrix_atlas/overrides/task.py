@@ -4,7 +4,7 @@ import frappe
 from frappe import _
 from erpnext.projects.doctype.task.task import Task
 from infintrix_atlas.api.v1 import switch_assignee_of_task
-from infintrix_atlas.role_utils import has_customer_portal_task_access
+from infintrix_atlas.permissions import get_project_access
 print("ATLAS TASK OVERRIDE LOADED")
 class TaskOverride(Task):
 
@@ -133,23 +133,16 @@ class TaskOverride(Task):
         ):
             return True
 
-        # Project-based access
+        # Project-based access (owner, Project User or customer portal)
         if self.project:
-            if frappe.db.get_value("Project", self.project, "owner") == user:
-                return True
-
-            if frappe.db.exists(
-                "Project User",
-                {
-                    "parent": self.project,
-                    "user": user
-                }
+            access = get_project_access(user)
+            if (
+                self.project in access["owned"]
+                or self.project in access["member"]
+                or self.project in access["customer"]
             ):
                 return True
 
-        if has_customer_portal_task_access(self.name, user=user):
-            return True
-
         return False
     def set_auto_assignee_when_status_changed(self):
         # Only auto-assign if status changed to Working, Completed, or Pending Review
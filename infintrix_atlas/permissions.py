@@ -1,9 +1,76 @@
 import frappe
-from infintrix_atlas.role_utils import (
-    get_customer_portal_customers,
-    has_customer_portal_access,
-    has_projects_manager_role,
-)
+from infintrix_atlas.role_utils import has_projects_manager_role
+
+
+# Per-user project access, cached in a Redis hash keyed by user. Each entry holds
+# the project names reachable through every access path so permission queries can
+# be emitted as flat `IN (...)` lists instead of correlated subqueries.
+PROJECT_ACCESS_CACHE = "atlas_project_access"
+
+
+def get_project_access(user):
+    """
+    Return `{"owned": [...], "member": [...], "customer": [...]}` project names for `user`:
+    projects they own, projects they are a Project User of, and projects of customers
+    they are a portal user for.
+    """
+    cache = frappe.cache()
+    access = cache.hget(PROJECT_ACCESS_CACHE, user)
+    if access is None:
+        access = _load_project_access(user)
+        cache.hset(PROJECT_ACCESS_CACHE, user, access)
+    return access
+
+
+def _load_project_access(user):
+    owned = frappe.db.sql_list(
+        "SELECT name FROM `tabProject` WHERE owner = %s",
+        (user,),
+    )
+    member = frappe.db.sql_list(
+        """
+        SELECT DISTINCT parent
+        FROM `tabProject User`
+        WHERE user = %s AND parenttype = 'Project'
+        """,
+        (user,),
+    )
+    customer = frappe.db.sql_list(
+        """
+        SELECT DISTINCT p.name
+        FROM `tabProject` p
+        INNER JOIN `tabPortal User` pu
+            ON pu.parent = p.customer
+            AND pu.parenttype = 'Customer'
+            AND pu.parentfield = 'portal_users'
+        WHERE pu.user = %s
+        """,
+        (user,),
+    )
+    return {"owned": owned, "member": member, "customer": customer}
+
+
+def clear_project_access_cache(doc=None, method=None):
+    """
+    doc_events hook for Project, Project User, Customer and Portal User.
+
+    A single membership row only affects its user; project or customer saves can
+    change owners, member tables or portal users wholesale, so they clear everyone.
+    """
+    cache = frappe.cache()
+    if doc is not None and doc.doctype in ("Project User", "Portal User") and doc.get("user"):
+        cache.hdel(PROJECT_ACCESS_CACHE, doc.user)
+        return
+
+    cache.delete_key(PROJECT_ACCESS_CACHE)
+
+
+def _projects_in(column, projects):
+    if not projects:
+        return "1=0"
+
+    escaped = ", ".join(frappe.db.escape(project) for project in sorted(set(projects)))
+    return f"{column} IN ({escaped})"
 
 
 def project_permission_query(user):
@@ -17,39 +84,14 @@ def project_permission_query(user):
     if "System Manager" in user_roles:
         return ""
 
-    escaped_user = frappe.db.escape(user)
-    portal_customers = get_customer_portal_customers(user) or []
-    customer_condition = ""
-    if portal_customers:
-        escaped_customers = ", ".join(frappe.db.escape(customer) for customer in portal_customers)
-        customer_condition = f"""
-            OR `tabProject`.customer IN ({escaped_customers})
-        """
+    access = get_project_access(user)
 
     # 2. Projects Manager logic
     if has_projects_manager_role(roles=user_roles):
-        return f"""
-				(
-					`tabProject`.owner = {escaped_user}
-					OR `tabProject`.name IN (
-						SELECT parent
-						FROM `tabProject User`
-						WHERE user = {escaped_user}
-					)
-				)
-			"""
+        return _projects_in("`tabProject`.name", access["owned"] + access["member"])
 
     # 3. Regular Project User
-    return f"""
-        (
-            `tabProject`.name IN (
-                SELECT parent
-                FROM `tabProject User`
-                WHERE user = {escaped_user}
-            )
-            {customer_condition}
-        )
-    """
+    return _projects_in("`tabProject`.name", access["member"] + access["customer"])
 
 
 def task_permission_query(user):
@@ -61,43 +103,108 @@ def task_permission_query(user):
         if "System Manager" in roles:
             return ""
 
-        escaped_user = frappe.db.escape(user)
-        portal_customers = get_customer_portal_customers(user) or []
-        customer_condition = ""
-        if portal_customers:
-            escaped_customers = ", ".join(frappe.db.escape(customer) for customer in portal_customers)
-            customer_condition = f"""
-                    OR `tabTask`.project IN (
-                        SELECT name
-                        FROM `tabProject`
-                        WHERE customer IN ({escaped_customers})
-                    )
-                """
+        access = get_project_access(user)
 
         # Projects Manager logic
         if has_projects_manager_role(roles=roles):
+            escaped_user = frappe.db.escape(user)
             return f"""
                     (
                         `tabTask`.owner = {escaped_user}
-                        OR `tabTask`.project IN (
-                            SELECT parent
-                            FROM `tabProject User`
-                            WHERE user = {escaped_user}
-                        )
+                        OR {_projects_in("`tabTask`.project", access["member"])}
                     )
                 """
-        
+
         # Regular Project User - see only tasks from projects where user is in Project User child table
-        return f"""
-                (
-                `tabTask`.project IN (
-                    SELECT parent
-                    FROM `tabProject User`
-                    WHERE user = {escaped_user}
-                )
-                {customer_condition}
-                )
-            """
+        return _projects_in("`tabTask`.project", access["member"] + access["customer"])
+
+
+def get_permitted_tasks(task_names, ptype="read", user=None):
+    """
+    Return the subset of `task_names` that `user` may access for `ptype`.
+
+    Applies the same rules as `TaskOverride.has_permission` (owner, ToDo assignee,
+    project owner / member, customer portal) for any number of tasks in a
+    constant number of queries.
+    """
+    user = user or frappe.session.user
+    task_names = list({name for name in task_names or [] if name})
+    if not task_names:
+        return set()
+
+    if not frappe.has_permission("Task", ptype, user=user):
+        return set()
+
+    if user == "Administrator":
+        return set(task_names)
+
+    tasks = frappe.db.sql(
+        """
+        SELECT name, owner, project
+        FROM `tabTask`
+        WHERE name IN %(names)s
+        """,
+        {"names": task_names},
+        as_dict=True,
+    )
+    assigned = set(frappe.db.sql_list(
+        """
+        SELECT DISTINCT reference_name
+        FROM `tabToDo`
+        WHERE reference_type = 'Task'
+            AND allocated_to = %(user)s
+            AND reference_name IN %(names)s
+        """,
+        {"user": user, "names": task_names},
+    ))
+
+    access = get_project_access(user)
+    projects = set(access["owned"]) | set(access["member"]) | set(access["customer"])
+
+    return {
+        task.name
+        for task in tasks
+        if task.owner == user or task.name in assigned or (task.project and task.project in projects)
+    }
+
+
+def can_view_project_board(project, user=None):
+    """Project-level access used for the cached board/backlog payloads."""
+    user = user or frappe.session.user
+    if not project:
+        return False
+
+    roles = frappe.get_roles(user)
+    if "Administrator" in roles:
+        return True
+
+    access = get_project_access(user)
+    if project in access["member"]:
+        return True
+
+    if has_projects_manager_role(roles=roles):
+        return project in access["owned"]
+
+    return project in access["customer"]
+
+
+def get_searchable_projects(user=None):
+    """
+    Projects whose records `user` may find through global search, mirroring
+    `project_permission_query`; None means every project.
+    """
+    user = user or frappe.session.user
+    if user == "Administrator":
+        return None
+
+    roles = frappe.get_roles(user)
+    if "System Manager" in roles:
+        return None
+
+    access = get_project_access(user)
+    if has_projects_manager_role(roles=roles):
+        return access["owned"] + access["member"]
+    return access["member"] + access["customer"]
 
 
 def _project_linked_permission_query(user, table, project_field="project"):
@@ -109,48 +216,13 @@ def _project_linked_permission_query(user, table, project_field="project"):
     if "System Manager" in roles:
         return ""
 
-    escaped_user = frappe.db.escape(user)
-    portal_customers = get_customer_portal_customers(user) or []
-    customer_condition = ""
-    if portal_customers:
-        escaped_customers = ", ".join(
-            frappe.db.escape(customer) for customer in portal_customers
-        )
-        customer_condition = f"""
-            OR `tab{table}`.{project_field} IN (
-                SELECT name
-                FROM `tabProject`
-                WHERE customer IN ({escaped_customers})
-            )
-        """
+    access = get_project_access(user)
+    column = f"`tab{table}`.{project_field}"
 
     if has_projects_manager_role(roles=roles):
-        return f"""
-            (
-                `tab{table}`.{project_field} IN (
-                    SELECT name
-                    FROM `tabProject`
-                    WHERE owner = {escaped_user}
-                )
-                OR `tab{table}`.{project_field} IN (
-                    SELECT parent
-                    FROM `tabProject User`
-                    WHERE user = {escaped_user}
-                )
-                {customer_condition}
-            )
-        """
+        return _projects_in(column, access["owned"] + access["member"] + access["customer"])
 
-    return f"""
-        (
-            `tab{table}`.{project_field} IN (
-                SELECT parent
-                FROM `tabProject User`
-                WHERE user = {escaped_user}
-            )
-            {customer_condition}
-        )
-    """
+    return _projects_in(column, access["member"] + access["customer"])
 
 
 def _project_linked_has_permission(doc, user, project_field="project"):
@@ -165,13 +237,8 @@ def _project_linked_has_permission(doc, user, project_field="project"):
     if not project:
         return False
 
-    if frappe.db.get_value("Project", project, "owner") == user:
-        return True
-
-    if frappe.db.exists("Project User", {"parent": project, "user": user}):
-        return True
-
-    return has_customer_portal_access(project=project, user=user)
+    access = get_project_access(user)
+    return project in access["owned"] or project in access["member"] or project in access["customer"]
 
 
 def requirement_permission_query(user):
@@ -0,0 +1,117 @@
+import frappe
+from frappe.utils import now, nowdate
+
+
+# The customer portal payload is precomputed per project and served from Redis.
+# Doc events on anything the portal shows mark the project's snapshot stale and
+# queue a rebuild; until it lands readers get the previous snapshot along with
+# when it was built and since when it is stale. Snapshots hold day-relative
+# figures (overdue counts, days to milestone), so one built on an earlier day
+# is rebuilt in the request.
+SNAPSHOT_TTL = 24 * 60 * 60
+MAX_REBUILD_PASSES = 3
+
+
+def _snapshot_key(project):
+    return f"atlas:portal_snapshot:{project}"
+
+
+def _stale_key(project):
+    return f"atlas:portal_stale:{project}"
+
+
+def _build(project):
+    # Imported here: api.v1 imports this module.
+    from infintrix_atlas.api.v1 import build_customer_portal_data
+
+    return build_customer_portal_data(project)
+
+
+def _store(project):
+    snapshot = {
+        "built_at": now(),
+        "built_on": nowdate(),
+        "data": _build(project),
+    }
+    frappe.cache().set_value(_snapshot_key(project), snapshot, expires_in_sec=SNAPSHOT_TTL)
+    return snapshot
+
+
+def get_portal_snapshot(project):
+    """
+    Portal payload for `project` plus a `snapshot` entry with `generated_at`,
+    `stale` and `stale_since`. Callers check access first; the payload is the
+    same for every user of the project.
+    """
+    cache = frappe.cache()
+    snapshot = cache.get_value(_snapshot_key(project))
+    if not snapshot or snapshot["built_on"] != nowdate():
+        snapshot = _store(project)
+
+    marker = cache.get_value(_stale_key(project))
+    stale = bool(marker) and marker["changed_at"] > snapshot["built_at"]
+    if stale:
+        # Also heals a change whose rebuild was deduplicated against a running
+        # one. Portal reads never commit, so enqueue right away.
+        _enqueue_rebuild(project, after_commit=False)
+
+    return {
+        **snapshot["data"],
+        "snapshot": {
+            "generated_at": snapshot["built_at"],
+            "stale": stale,
+            "stale_since": marker["since"] if stale else None,
+        },
+    }
+
+
+def _enqueue_rebuild(project, after_commit=True):
+    frappe.enqueue(
+        "infintrix_atlas.portal_snapshot.rebuild_portal_snapshot",
+        queue="short",
+        job_id=f"atlas_portal_snapshot::{project}",
+        deduplicate=True,
+        enqueue_after_commit=after_commit,
+        project=project,
+    )
+
+
+def rebuild_portal_snapshot(project):
+    """Background job. Builds again if the project changed during a build."""
+    cache = frappe.cache()
+    for _ in range(MAX_REBUILD_PASSES):
+        marker = cache.get_value(_stale_key(project))
+        _store(project)
+        if cache.get_value(_stale_key(project)) == marker:
+            cache.delete_value(_stale_key(project))
+            return
+
+
+def invalidate_portal_snapshot(*projects):
+    cache = frappe.cache()
+    timestamp = now()
+    for project in {p for p in projects if p}:
+        # `since` is the first change the snapshot misses, `changed_at` the latest.
+        marker = cache.get_value(_stale_key(project)) or {"since": timestamp}
+        marker["changed_at"] = timestamp
+        cache.set_value(_stale_key(project), marker, expires_in_sec=SNAPSHOT_TTL)
+        _enqueue_rebuild(project)
+
+
+def _projects_for_doc(doc):
+    if doc.doctype == "Project":
+        return [doc.name]
+
+    projects = [doc.get("project")]
+    before = doc.get_doc_before_save()
+    if before:
+        projects.append(before.get("project"))
+    return projects
+
+
+def mark_portal_snapshot_stale(doc, method=None):
+    """
+    doc_events hook for Project, Task, Project Phase, Project Action Request,
+    Requirement, Project Resource and Sales Invoice.
+    """
+    invalidate_portal_snapshot(*_projects_for_doc(doc))
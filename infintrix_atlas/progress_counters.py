@@ -0,0 +1,177 @@
+import frappe
+from frappe.utils import flt
+
+
+# Project Phase and Cycle carry denormalised task counters so progress reads
+# are a single row lookup. Task doc events apply the change as atomic deltas;
+# writes that bypass doc events recompute the parents they touched, and a
+# daily job recomputes everything to repair any drift.
+COUNTER_LINKS = {
+    "Project Phase": "custom_phase",
+    "Cycle": "custom_cycle",
+}
+COUNTER_FIELDS = (
+    "total_tasks",
+    "completed_tasks",
+    "open_tasks",
+    "total_story_points",
+    "completed_story_points",
+)
+
+
+def _counter_fields(doctype):
+    if doctype == "Project Phase":
+        return [*COUNTER_FIELDS, "completion_percentage"]
+    return list(COUNTER_FIELDS)
+
+
+def keep_stored_counters(doc):
+    """
+    Called from the Project Phase and Cycle before_save. Only this module
+    writes the counters, so a document save (form, status change, script)
+    keeps the database values instead of the ones it loaded earlier.
+    """
+    fields = _counter_fields(doc.doctype)
+    if doc.is_new():
+        doc.update(dict.fromkeys(fields, 0))
+        return
+
+    # Lock the row so no delta lands between this read and the save.
+    stored = frappe.db.get_value(doc.doctype, doc.name, fields, as_dict=True, for_update=True)
+    if stored:
+        doc.update(stored)
+
+
+def _contribution(status, story_points):
+    completed = status == "Completed"
+    points = flt(story_points)
+    return {
+        "total_tasks": 1,
+        "completed_tasks": int(completed),
+        "open_tasks": int(not completed),
+        "total_story_points": points,
+        "completed_story_points": points if completed else 0,
+    }
+
+
+def _completion_sql(doctype):
+    # Single-table UPDATEs assign left to right, so this sees the new counts.
+    if doctype != "Project Phase":
+        return ""
+    return (
+        ", completion_percentage = IF(total_tasks > 0,"
+        " ROUND(completed_tasks * 100 / total_tasks, 2), 0)"
+    )
+
+
+def _apply_delta(doctype, name, contribution, sign):
+    assignments = ", ".join(f"`{field}` = `{field}` + %({field})s" for field in COUNTER_FIELDS)
+    params = {field: sign * contribution[field] for field in COUNTER_FIELDS}
+    params["name"] = name
+    frappe.db.sql(
+        f"""
+        UPDATE `tab{doctype}`
+        SET {assignments}{_completion_sql(doctype)}
+        WHERE name = %(name)s
+        """,
+        params,
+    )
+
+
+def update_progress_counters(doc, method=None):
+    """Task on_update hook: move the task's contribution between phases/cycles."""
+    before = doc.get_doc_before_save()
+    new = _contribution(doc.status, doc.get("custom_story_points"))
+    old = _contribution(before.status, before.get("custom_story_points")) if before else None
+
+    for doctype, link in COUNTER_LINKS.items():
+        new_parent = doc.get(link)
+        old_parent = before.get(link) if before else None
+        if new_parent == old_parent and new == old:
+            continue
+        if old_parent:
+            _apply_delta(doctype, old_parent, old, -1)
+        if new_parent:
+            _apply_delta(doctype, new_parent, new, 1)
+
+
+def remove_progress_counters(doc, method=None):
+    """Task on_trash hook."""
+    contribution = _contribution(doc.status, doc.get("custom_story_points"))
+    for doctype, link in COUNTER_LINKS.items():
+        if doc.get(link):
+            _apply_delta(doctype, doc.get(link), contribution, -1)
+
+
+def _recompute(doctype, names=None):
+    """
+    Recompute counters of `names` (every row when None) from `tabTask` and
+    write the rows that differ. Returns how many rows were corrected.
+    """
+    link = COUNTER_LINKS[doctype]
+    params = {}
+    if names is None:
+        condition = f"`{link}` IS NOT NULL AND `{link}` != ''"
+        filters = {}
+    else:
+        names = {name for name in names if name}
+        if not names:
+            return 0
+        condition = f"`{link}` IN %(names)s"
+        params["names"] = tuple(names)
+        filters = {"name": ["in", list(names)]}
+
+    actual = {
+        row[0]: {
+            "total_tasks": int(row[1]),
+            "completed_tasks": int(row[2] or 0),
+            "open_tasks": int(row[1]) - int(row[2] or 0),
+            "total_story_points": flt(row[3]),
+            "completed_story_points": flt(row[4]),
+        }
+        for row in frappe.db.sql(
+            f"""
+            SELECT `{link}`,
+                COUNT(*),
+                SUM(status = 'Completed'),
+                SUM(COALESCE(custom_story_points, 0)),
+                SUM(IF(status = 'Completed', COALESCE(custom_story_points, 0), 0))
+            FROM `tabTask`
+            WHERE {condition}
+            GROUP BY `{link}`
+            """,
+            params,
+        )
+    }
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+
+    fields = ["name", *_counter_fields(doctype)]
+
+    corrected = 0
+    for row in frappe.get_all(doctype, filters=filters, fields=fields):
+        values = actual.get(row.name, empty)
+        if doctype == "Project Phase":
+            values = {
+                **values,
+                "completion_percentage": round(
+                    values["completed_tasks"] * 100 / values["total_tasks"], 2
+                ) if values["total_tasks"] else 0,
+            }
+        if any(flt(row.get(field)) != flt(value) for field, value in values.items()):
+            frappe.db.set_value(doctype, row.name, values, update_modified=False)
+            corrected += 1
+    return corrected
+
+
+def refresh_progress_counters(phases=(), cycles=()):
+    """Recompute the counters of the given phases and cycles, e.g. after a raw
+    UPDATE or a bulk insert that skipped the Task hooks."""
+    _recompute("Project Phase", phases)
+    _recompute("Cycle", cycles)
+
+
+def reconcile_progress_counters():
+    """Daily job: recompute every phase and cycle and log what had drifted."""
+    corrected = {doctype: _recompute(doctype) for doctype in COUNTER_LINKS}
+    if any(corrected.values()):
+        frappe.logger("infintrix_atlas").info(f"Progress counters repaired: {corrected}")
@@ -0,0 +1,153 @@
+import frappe
+
+
+# Board order is kept in Task.custom_rank, a base-36 fraction compared as a
+# plain string: moving a card writes one key strictly between its new
+# neighbours and leaves every other row alone. Keys grow by roughly one
+# character per five inserts into the same gap, so once a key passes
+# MAX_RANK_LENGTH the project's ranks are respread in the background.
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+MAX_RANK_LENGTH = 12
+REBALANCE_CHUNK_SIZE = 500
+
+
+def rank_between(lower=None, upper=None):
+    """
+    A key that sorts strictly between `lower` and `upper`; None is an open end.
+    Generated keys never end in "0", so there is always room below them.
+    """
+    lower = lower or ""
+    upper = upper or ""
+    if upper and lower >= upper:
+        raise ValueError(f"Rank {lower!r} is not below {upper!r}")
+
+    if not upper:
+        # Appending is the common case: bump the first digit that can still
+        # grow and drop the rest, which keeps keys at the end of a column short.
+        for i, char in enumerate(lower):
+            if char != DIGITS[-1]:
+                return lower[:i] + DIGITS[DIGITS.index(char) + 1]
+
+    rank = ""
+    i = 0
+    while True:
+        lo = DIGITS.index(lower[i]) if i < len(lower) else 0
+        hi = DIGITS.index(upper[i]) if i < len(upper) else BASE
+        if lo == hi:
+            rank += DIGITS[lo]
+            i += 1
+            continue
+
+        mid = (lo + hi) // 2
+        if mid > lo:
+            return rank + DIGITS[mid]
+
+        # Adjacent digits: keep the lower one; below `upper` now, so the rest
+        # only has to stay above `lower`.
+        rank += DIGITS[lo]
+        upper = ""
+        i += 1
+
+
+def spread_ranks(count):
+    """
+    `count` evenly spaced keys in ascending order. They fill the lower half of
+    the key space so new tasks appended afterwards still get short keys.
+    """
+    width = 1
+    while BASE**width <= count:
+        width += 1
+    width += 1
+
+    keys = []
+    for position in range(1, count + 1):
+        value = position * (BASE**width // 2) // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+def next_rank(project):
+    """Key after the current last task of `project`, for newly created tasks."""
+    last = frappe.db.sql(
+        "SELECT MAX(custom_rank) FROM `tabTask` WHERE project = %s",
+        project,
+    )[0][0]
+    return rank_between(last, None)
+
+
+def set_initial_rank(doc, method=None):
+    """Task before_insert hook: new tasks go to the bottom of their column."""
+    if not doc.get("custom_rank") and doc.project:
+        doc.custom_rank = next_rank(doc.project)
+
+
+def enqueue_rank_rebalance(project):
+    frappe.enqueue(
+        "infintrix_atlas.ranking.rebalance_project_ranks",
+        queue="long",
+        job_id=f"atlas_rank_rebalance::{project}",
+        deduplicate=True,
+        enqueue_after_commit=True,
+        project=project,
+    )
+
+
+def rebalance_project_ranks(project):
+    """
+    Respread every task rank of `project`, keeping the current order. Tasks
+    without a rank (created before ranks existed) follow in their old
+    custom_sort_order, then creation order.
+    """
+    order_by = ["custom_rank IS NULL", "custom_rank"]
+    if frappe.db.has_column("Task", "custom_sort_order"):
+        order_by += ["custom_sort_order IS NULL", "custom_sort_order"]
+    order_by += ["creation", "name"]
+
+    # FOR UPDATE holds off moves in this project until the new keys are in.
+    names = frappe.db.sql_list(
+        f"""
+        SELECT name FROM `tabTask`
+        WHERE project = %s
+        ORDER BY {", ".join(order_by)}
+        FOR UPDATE
+        """,
+        project,
+    )
+    if not names:
+        return
+
+    ranks = list(zip(names, spread_ranks(len(names))))
+    for start in range(0, len(ranks), REBALANCE_CHUNK_SIZE):
+        chunk = ranks[start:start + REBALANCE_CHUNK_SIZE]
+        params = {}
+        cases = []
+        for idx, (name, rank) in enumerate(chunk):
+            params[f"name_{idx}"] = name
+            params[f"rank_{idx}"] = rank
+            cases.append(f"WHEN %(name_{idx})s THEN %(rank_{idx})s")
+        params["names"] = tuple(name for name, _rank in chunk)
+        frappe.db.sql(
+            f"""
+            UPDATE `tabTask`
+            SET custom_rank = CASE name {' '.join(cases)} END
+            WHERE name IN %(names)s
+            """,
+            params,
+        )
+    frappe.db.commit()
+
+
+def backfill_ranks():
+    """Queue a rebalance for every project that still has unranked tasks."""
+    for project in frappe.db.sql_list(
+        """
+        SELECT DISTINCT project FROM `tabTask`
+        WHERE project IS NOT NULL AND project != '' AND custom_rank IS NULL
+        """
+    ):
+        enqueue_rank_rebalance(project)
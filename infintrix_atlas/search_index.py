@@ -0,0 +1,230 @@
+import re
+
+import frappe
+from frappe.utils import now, strip_html_tags
+from infintrix_atlas.typeahead import bump_typeahead_version
+
+
+# Global search reads from `tabAtlas Search Index`, one row per searchable
+# document, instead of LIKE-scanning each source table. Rows are upserted from
+# doc events and ranked with InnoDB FULLTEXT in boolean mode.
+SEARCH_SOURCES = {
+    "Task": {"title": "subject", "content": ["description"], "project": "project"},
+    "Project": {"title": "project_name", "content": ["notes"], "project": "name"},
+    "Cycle": {"title": "cycle_name", "content": [], "project": "project"},
+    "Requirement": {"title": "title", "content": ["description", "acceptance_criteria"], "project": "project"},
+    "Change Request": {"title": "title", "content": ["description"], "project": "project"},
+}
+
+INDEX_TABLE = "tabAtlas Search Index"
+FULLTEXT_INDEXES = {
+    "atlas_search_fulltext": "title, content",
+    "atlas_search_title_fulltext": "title",
+}
+
+# InnoDB ignores words shorter than innodb_ft_min_token_size (3 by default);
+# queries made only of shorter words fall back to a title prefix match.
+MIN_TOKEN_SIZE = 3
+MAX_CONTENT_LENGTH = 20000
+REBUILD_BATCH_SIZE = 1000
+
+
+def ensure_search_index():
+    """Create the FULLTEXT indexes; the doctype JSON cannot declare them."""
+    existing = {
+        row[2] for row in frappe.db.sql(f"SHOW INDEX FROM `{INDEX_TABLE}`")
+    }
+    for index_name, columns in FULLTEXT_INDEXES.items():
+        if index_name not in existing:
+            frappe.db.sql_ddl(
+                f"ALTER TABLE `{INDEX_TABLE}` ADD FULLTEXT INDEX `{index_name}` ({columns})"
+            )
+
+    if not frappe.db.count("Atlas Search Index"):
+        frappe.enqueue(
+            "infintrix_atlas.search_index.rebuild_search_index",
+            queue="long",
+            timeout=3600,
+            job_id="atlas_search_index_rebuild",
+            deduplicate=True,
+        )
+
+
+def _index_name(doctype, name):
+    return f"{doctype}::{name}"
+
+
+def _row(doctype, values, project_titles):
+    source = SEARCH_SOURCES[doctype]
+    project = values.get(source["project"])
+    content = " ".join(
+        strip_html_tags(values.get(field) or "") for field in source["content"]
+    )
+    return {
+        "name": _index_name(doctype, values["name"]),
+        "reference_doctype": doctype,
+        "reference_name": values["name"],
+        "project": project,
+        "project_title": project_titles.get(project) or project,
+        "title": (values.get(source["title"]) or values["name"])[:255],
+        "content": content[:MAX_CONTENT_LENGTH],
+    }
+
+
+def _upsert(rows, bump_typeahead=True):
+    if not rows:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    columns = ["reference_doctype", "reference_name", "project", "project_title", "title", "content"]
+    placeholders = []
+    params = []
+    for row in rows:
+        placeholders.append("(%s, %s, %s, %s, %s, 0, 0" + ", %s" * len(columns) + ")")
+        params.extend([row["name"], timestamp, timestamp, user, user])
+        params.extend(row[c] for c in columns)
+
+    updates = ", ".join(f"`{c}` = VALUES(`{c}`)" for c in columns + ["modified", "modified_by"])
+    frappe.db.sql(
+        f"""
+        INSERT INTO `{INDEX_TABLE}`
+            (name, creation, modified, owner, modified_by, docstatus, idx,
+            {", ".join(f"`{c}`" for c in columns)})
+        VALUES {", ".join(placeholders)}
+        ON DUPLICATE KEY UPDATE {updates}
+        """,
+        params,
+    )
+    if bump_typeahead:
+        bump_typeahead_version(*{row["project"] for row in rows})
+
+
+def index_documents(docs, bump_typeahead=True):
+    """Upsert index rows for documents written without doc events (bulk paths)."""
+    projects = {doc.get(SEARCH_SOURCES[doc.doctype]["project"]) for doc in docs} - {None, ""}
+    project_titles = dict(
+        frappe.get_all(
+            "Project",
+            filters={"name": ["in", list(projects)]},
+            fields=["name", "project_name"],
+            as_list=True,
+        )
+    ) if projects else {}
+
+    _upsert([_row(doc.doctype, doc.as_dict(), project_titles) for doc in docs], bump_typeahead)
+
+
+def _indexed_fields(doctype):
+    source = SEARCH_SOURCES[doctype]
+    return {source["title"], source["project"], *source["content"]}
+
+
+def update_search_index(doc, method=None):
+    """doc_events on_update hook for every doctype in SEARCH_SOURCES."""
+    # has_value_changed is True for every field of a new document.
+    if not any(doc.has_value_changed(field) for field in _indexed_fields(doc.doctype)):
+        return
+
+    # Typeahead only holds titles and projects; content edits leave it valid.
+    source = SEARCH_SOURCES[doc.doctype]
+    bump = doc.has_value_changed(source["title"]) or doc.has_value_changed(source["project"])
+
+    if doc.doctype == "Project":
+        _upsert([_row(doc.doctype, doc.as_dict(), {doc.name: doc.project_name})], bump)
+        if doc.has_value_changed("project_name"):
+            frappe.db.sql(
+                f"UPDATE `{INDEX_TABLE}` SET project_title = %s WHERE project = %s",
+                (doc.project_name or doc.name, doc.name),
+            )
+        return
+
+    index_documents([doc], bump)
+    if bump and doc.has_value_changed(source["project"]):
+        # Moved between projects: the old one loses the item.
+        before = doc.get_doc_before_save()
+        if before:
+            bump_typeahead_version(before.get(source["project"]))
+
+
+def remove_from_search_index(doc, method=None):
+    """doc_events on_trash hook for every doctype in SEARCH_SOURCES."""
+    frappe.db.delete("Atlas Search Index", {"name": _index_name(doc.doctype, doc.name)})
+    bump_typeahead_version(doc.get(SEARCH_SOURCES[doc.doctype]["project"]))
+
+
+def rebuild_search_index(doctype=None):
+    """
+    Re-index every source document, in batches. Run from the queue, e.g.
+
+        bench --site <site> execute infintrix_atlas.search_index.rebuild_search_index
+    """
+    project_titles = dict(frappe.get_all("Project", fields=["name", "project_name"], as_list=True))
+
+    for source_doctype in [doctype] if doctype else list(SEARCH_SOURCES):
+        fields = list({"name", *_indexed_fields(source_doctype)})
+
+        frappe.db.delete("Atlas Search Index", {"reference_doctype": source_doctype})
+
+        last_name = ""
+        while True:
+            rows = frappe.get_all(
+                source_doctype,
+                filters={"name": [">", last_name]},
+                fields=fields,
+                order_by="name asc",
+                limit=REBUILD_BATCH_SIZE,
+            )
+            if not rows:
+                break
+            _upsert([_row(source_doctype, row, project_titles) for row in rows], bump_typeahead=False)
+            frappe.db.commit()
+            last_name = rows[-1].name
+
+    bump_typeahead_version()
+
+
+def _boolean_query(terms):
+    # Every term is required and prefix-matched: "api auth" -> "+api* +auth*".
+    return " ".join(f"+{term}*" for term in terms)
+
+
+def search_index(query, limit=20, projects=None):
+    """
+    Ranked matches for `query`. `projects` limits results to those projects;
+    None means no restriction. Title matches weigh three times body matches.
+    """
+    terms = [t for t in re.findall(r"\w+", query.lower()) if len(t) >= MIN_TOKEN_SIZE]
+    conditions = []
+    params = {"limit": int(limit)}
+
+    if terms:
+        params["q"] = _boolean_query(terms)
+        score = (
+            "MATCH(title) AGAINST (%(q)s IN BOOLEAN MODE) * 3"
+            " + MATCH(title, content) AGAINST (%(q)s IN BOOLEAN MODE)"
+        )
+        conditions.append("MATCH(title, content) AGAINST (%(q)s IN BOOLEAN MODE)")
+    else:
+        params["prefix"] = re.sub(r"([\\%_])", r"\\\1", query.strip()) + "%"
+        score = "1"
+        conditions.append("title LIKE %(prefix)s")
+
+    if projects is not None:
+        if not projects:
+            return []
+        params["projects"] = tuple(projects)
+        conditions.append("project IN %(projects)s")
+
+    return frappe.db.sql(
+        f"""
+        SELECT reference_doctype, reference_name, project, project_title, title,
+            {score} AS score
+        FROM `{INDEX_TABLE}`
+        WHERE {" AND ".join(conditions)}
+        ORDER BY score DESC, modified DESC
+        LIMIT %(limit)s
+        """,
+        params,
+        as_dict=True,
+    )
@@ -0,0 +1,220 @@
+import hashlib
+import re
+from bisect import bisect_left
+from collections import OrderedDict
+
+import frappe
+
+
+# Typeahead matches word prefixes of item titles without touching the
+# database. The titles in Atlas Search Index are cached in Redis per project,
+# each under that project's current version, and each worker keeps word-prefix
+# indexes of the projects it served last. A user's scope (the projects global
+# search would show them, or every project) is answered from the indexes of its
+# projects. Index writes bump only the projects they touch, so one task edit
+# reloads one project instead of every scope.
+TYPEAHEAD_TTL = 10 * 60
+LOCAL_INDEXES = 1000
+RECENT_PREFIXES = 20
+VERSIONS_KEY = "atlas:typeahead_versions"
+PROJECTS_KEY = "atlas:typeahead_projects"
+
+_local_indexes = OrderedDict()
+
+
+def _rank(items, phrase):
+    # Titles that start with the query first, then shorter titles.
+    return sorted(
+        items,
+        key=lambda item: (not item[2].lower().startswith(phrase), len(item[2]), item[2]),
+    )
+
+
+class PrefixIndex:
+    def __init__(self, items):
+        self.items = items
+        postings = {}
+        for idx, item in enumerate(items):
+            for word in set(re.findall(r"\w+", item[2].lower())):
+                postings.setdefault(word, []).append(idx)
+        self.words = sorted(postings)
+        self.postings = [postings[word] for word in self.words]
+
+    def _ids_for(self, term):
+        lo = bisect_left(self.words, term)
+        hi = bisect_left(self.words, term + "\uffff")
+        ids = set()
+        for posting in self.postings[lo:hi]:
+            ids.update(posting)
+        return ids
+
+    def match(self, terms, limit):
+        ids = None
+        for term in terms:
+            ids = self._ids_for(term) if ids is None else ids & self._ids_for(term)
+            if not ids:
+                return []
+
+        return _rank((self.items[i] for i in ids), " ".join(terms))[:limit]
+
+
+def _bucket(project):
+    # Rows without a project share one bucket, visible to the unrestricted scope only.
+    return project or ""
+
+
+def _all_projects():
+    cache = frappe.cache()
+    projects = cache.get_value(PROJECTS_KEY)
+    if projects is None:
+        projects = frappe.db.sql_list(
+            "SELECT DISTINCT IFNULL(project, '') FROM `tabAtlas Search Index`"
+        )
+        cache.set_value(PROJECTS_KEY, projects, expires_in_sec=TYPEAHEAD_TTL)
+    return projects
+
+
+def get_typeahead_versions(projects):
+    """Sorted (project, version) pairs of a scope; `projects` None is every project."""
+    if projects is None:
+        projects = _all_projects()
+
+    cache = frappe.cache()
+    versions = {frappe.safe_decode(k): v for k, v in (cache.hgetall(VERSIONS_KEY) or {}).items()}
+    scope = []
+    for project in sorted(set(projects)):
+        version = versions.get(project)
+        if not version:
+            version = frappe.generate_hash(length=10)
+            cache.hset(VERSIONS_KEY, project, version)
+        scope.append((project, version))
+    return scope
+
+
+def bump_typeahead_version(*projects):
+    """Retire the cached titles of `projects`; with no arguments, of every project."""
+    cache = frappe.cache()
+    if not projects:
+        cache.delete_value([VERSIONS_KEY, PROJECTS_KEY])
+        return
+
+    buckets = {_bucket(project) for project in projects}
+    known = cache.get_value(PROJECTS_KEY)
+    if known is not None and not buckets <= set(known):
+        cache.delete_value(PROJECTS_KEY)
+    for bucket in buckets:
+        cache.hdel(VERSIONS_KEY, bucket)
+
+
+def _load_items(buckets):
+    conditions = []
+    params = {}
+    named = [bucket for bucket in buckets if bucket]
+    if named:
+        conditions.append("project IN %(projects)s")
+        params["projects"] = tuple(named)
+    if "" in buckets:
+        conditions.append("IFNULL(project, '') = ''")
+
+    items = {bucket: [] for bucket in buckets}
+    for row in frappe.db.sql(
+        f"""
+        SELECT reference_doctype, reference_name, title, project, project_title
+        FROM `tabAtlas Search Index`
+        WHERE {" OR ".join(conditions)}
+        """,
+        params,
+    ):
+        items.setdefault(_bucket(row[3]), []).append(tuple(row))
+    return items
+
+
+def _remember(key, items):
+    index = PrefixIndex(items)
+    _local_indexes[key] = index
+    while len(_local_indexes) > LOCAL_INDEXES:
+        _local_indexes.popitem(last=False)
+    return index
+
+
+def _get_indexes(scope):
+    cache = frappe.cache()
+    indexes = []
+    missing = []
+    for project, version in scope:
+        key = f"atlas:typeahead:{project}:{version}"
+        index = _local_indexes.get(key)
+        if index is not None:
+            _local_indexes.move_to_end(key)
+            indexes.append(index)
+            continue
+
+        items = cache.get_value(key)
+        if items is None:
+            missing.append((project, key))
+        else:
+            indexes.append(_remember(key, items))
+
+    if missing:
+        # Every project that is cold in Redis is loaded with one query.
+        loaded = _load_items([project for project, _key in missing])
+        for project, key in missing:
+            items = loaded.get(project, [])
+            cache.set_value(key, items, expires_in_sec=TYPEAHEAD_TTL)
+            indexes.append(_remember(key, items))
+    return indexes
+
+
+def _match(indexes, terms, limit):
+    # Each project's best `limit` matches include the scope's best `limit`.
+    matches = [item for index in indexes for item in index.match(terms, limit)]
+    return _rank(matches, " ".join(terms))[:limit]
+
+
+def typeahead(query, projects, limit=8):
+    """
+    Items whose title has a word starting with each word of `query`, as
+    (doctype, name, title, project, project_title) tuples.
+
+    The last RECENT_PREFIXES answers are cached per session. While the user
+    keeps typing, a cached answer for a shorter prefix that was not cut off by
+    `limit` already contains every possible match, so it is filtered in memory.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return []
+
+    phrase = " ".join(terms)
+    scope = get_typeahead_versions(projects)
+    cache = frappe.cache()
+    recent_key = f"atlas:typeahead_recent:{frappe.session.sid}"
+    # Any change to a project in scope invalidates the recent answers.
+    token = hashlib.md5("\x1f".join(f"{p}:{v}" for p, v in scope).encode()).hexdigest()
+    state = (token, limit)
+    recent = cache.get_value(recent_key)
+    if not recent or recent["state"] != state:
+        recent = {"state": state, "entries": OrderedDict()}
+    entries = recent["entries"]
+
+    if phrase in entries:
+        results = entries.pop(phrase)
+    else:
+        base = next(
+            (
+                rows
+                for prefix, rows in reversed(entries.items())
+                if phrase.startswith(prefix) and len(rows) < limit
+            ),
+            None,
+        )
+        if base is not None:
+            results = PrefixIndex(base).match(terms, limit)
+        else:
+            results = _match(_get_indexes(scope), terms, limit)
+
+    entries[phrase] = results
+    while len(entries) > RECENT_PREFIXES:
+        entries.popitem(last=False)
+    cache.set_value(recent_key, recent, expires_in_sec=TYPEAHEAD_TTL)
+
+    return results
@@ -0,0 +1,58 @@
+import time
+
+import frappe
+
+
+# Full names and avatars change rarely, so each worker keeps them for a few
+# minutes instead of asking the database again for every row it decorates.
+USER_DISPLAY_TTL = 5 * 60
+MAX_CACHED_USERS = 5000
+
+_cache = {}
+
+
+def get_user_display(users):
+    """
+    Return {user: {"full_name", "user_image"}} for every id in `users`, loading
+    all cache misses with a single query. Unknown ids map to themselves.
+    """
+    users = {u for u in users or [] if u}
+    if not users:
+        return {}
+
+    site = frappe.local.site
+    now = time.monotonic()
+    result = {}
+    missing = []
+    for user in users:
+        entry = _cache.get((site, user))
+        if entry and entry[0] > now:
+            result[user] = entry[1]
+        else:
+            missing.append(user)
+
+    if missing:
+        if len(_cache) + len(missing) > MAX_CACHED_USERS:
+            _cache.clear()
+
+        rows = frappe.get_all(
+            "User",
+            filters={"name": ["in", missing]},
+            fields=["name", "full_name", "user_image"],
+        )
+        loaded = {row.name: row for row in rows}
+        for user in missing:
+            row = loaded.get(user)
+            display = {
+                "full_name": (row.full_name if row else None) or user,
+                "user_image": row.user_image if row else None,
+            }
+            _cache[(site, user)] = (now + USER_DISPLAY_TTL, display)
+            result[user] = display
+
+    return result
+
+
+def get_full_names(users):
+    """{user: full name (or the id itself)} for every id in `users`."""
+    return {user: display["full_name"] for user, display in get_user_display(users).items()}